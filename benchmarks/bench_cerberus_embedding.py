@@ -0,0 +1,41 @@
+"""
+Measures Cerberus rendering of deeply embedded entities
+with and without cache of rendered entity bodies.
+
+    $ python benchmarks/bench_cerberus_embedding.py 4 6 8
+"""
+import sys
+import time
+
+from mutant.parsers.python_parser import PythonParser
+from mutant_cerberus.generator import CerberusSchemaGenerator
+from synthetic import deep_definition
+
+
+class UncachedCerberusSchemaGenerator(CerberusSchemaGenerator):
+    def render_entity_body(self, entity):
+        return self._render_entity_body(entity)
+
+    def embed_entity_list(self, entity_name):
+        self.list_fragments.clear()
+        return super(UncachedCerberusSchemaGenerator, self).embed_entity_list(entity_name)
+
+
+def measure(generator_class, schema):
+    started = time.time()
+    output = generator_class(schema).render()
+    return time.time() - started, len(output)
+
+
+def main(depths):
+    parser = PythonParser()
+    print('{0:>6} {1:>12} {2:>10} {3:>10}'.format('depth', 'output, KiB', 'cached', 'uncached'))
+    for depth in depths:
+        schema = parser.parse(deep_definition(depth))
+        cached, size = measure(CerberusSchemaGenerator, schema)
+        uncached, _ = measure(UncachedCerberusSchemaGenerator, schema)
+        print('{0:6d} {1:12.1f} {2:10.4f} {3:10.4f}'.format(depth, size / 1024.0, cached, uncached))
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [4, 6, 8])
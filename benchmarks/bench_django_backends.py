@@ -0,0 +1,52 @@
+"""
+Measures Django models rendering with Jinja and native field backends:
+whole render and writing of fields alone.
+
+    $ python benchmarks/bench_django_backends.py 500 2000
+"""
+import sys
+import time
+
+from mutant.generators.writer import CodeWriter
+from mutant.parsers.python_parser import PythonParser
+from mutant_django.generator import DjangoSchemaGenerator
+from synthetic import high_level_definition
+
+
+def measure_render(schema, backend):
+    started = time.time()
+    output = DjangoSchemaGenerator(schema, backend=backend).render()
+    return time.time() - started, output
+
+
+def measure_fields(schema, method):
+    fields = [
+        field
+        for renderer in DjangoSchemaGenerator(schema)._renderers()
+        for field in renderer.fields
+    ]
+    writer = CodeWriter()
+    started = time.time()
+    for field in fields:
+        getattr(field, method)(writer)
+    return time.time() - started, len(fields)
+
+
+def main(sizes):
+    # Warm up imports and inflection
+    DjangoSchemaGenerator(PythonParser().parse(high_level_definition(10)), backend='jinja').render()
+    print('{0:>6} {1:>8} {2:>13} {3:>13} {4:>15} {5:>15} {6:>8}'.format(
+        'size', 'fields', 'render jinja', 'render native', 'jinja fields/s', 'native fields/s', 'speedup'))
+    for size in sizes:
+        schema = PythonParser().parse(high_level_definition(size, lists=0.1))
+        jinja, expected = measure_render(schema, 'jinja')
+        native, output = measure_render(schema, 'native')
+        assert output == expected
+        jinja_fields, count = measure_fields(schema, 'write')
+        native_fields, _ = measure_fields(schema, 'emit')
+        print('{0:6d} {1:8d} {2:13.4f} {3:13.4f} {4:15.0f} {5:15.0f} {6:7.1f}x'.format(
+            size, count, jinja, native, count / jinja_fields, count / native_fields, jinja_fields / native_fields))
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [500, 2000])
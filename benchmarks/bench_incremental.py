@@ -0,0 +1,52 @@
+"""
+Measures full and incremental rendering after one field was added to one entity.
+
+    $ python benchmarks/bench_incremental.py 500 2000
+"""
+import sys
+import time
+
+from mutant.incremental import IncrementalRenderer
+from mutant.parsers.python_parser import PythonParser
+from mutant_cerberus.generator import CerberusSchemaGenerator
+from mutant_django.generator import DjangoSchemaGenerator
+from synthetic import high_level_definition
+
+
+GENERATORS = (
+    ('django', DjangoSchemaGenerator, {}),
+    ('cerberus', CerberusSchemaGenerator, {'mode': 'registry'}),
+)
+
+
+def changed_definition(size):
+    definition = high_level_definition(size, lists=0.1)
+    name = sorted(definition)[size // 2]
+    definition[name] = definition[name] + [{'extra': {'type': 'Integer'}}]
+    return definition
+
+
+def measure(function, *args):
+    started = time.time()
+    result = function(*args)
+    return time.time() - started, result
+
+
+def main(sizes):
+    print('{0:>6} {1:>10} {2:>10} {3:>12} {4:>10}'.format(
+        'size', 'generator', 'full', 'incremental', 'rendered'))
+    for size in sizes:
+        before = PythonParser().parse(high_level_definition(size, lists=0.1))
+        after = PythonParser().parse(changed_definition(size))
+        for name, generator_class, options in GENERATORS:
+            renderer = IncrementalRenderer()
+            renderer.render(generator_class(before, **options))
+            full, expected = measure(lambda: generator_class(after, **options).render())
+            incremental, output = measure(renderer.render, generator_class(after, **options))
+            assert output == expected
+            print('{0:6d} {1:>10} {2:10.4f} {3:12.4f} {4:10d}'.format(
+                size, name, full, incremental, renderer.rendered))
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [500, 2000])
@@ -0,0 +1,67 @@
+"""
+Compares memory taken by schema IR of PythonParser
+with the plain dicts IR, which was used before `Entity` and `Field` records.
+
+    $ python benchmarks/bench_ir_memory.py 1000 10000
+"""
+import sys
+import tracemalloc
+
+from mutant.parsers.python_parser import PythonParser
+from synthetic import high_level_definition
+
+
+def legacy_parse(definition):
+    schema = []
+    for entity_name, field_defs in definition.items():
+        fields = []
+        entity_options = []
+        for data in field_defs:
+            name, parameters = next(iter(data.items()))
+            if name == 'OPTIONS':
+                entity_options = parameters
+            else:
+                options = dict(parameters)
+                typename = options.pop('type')
+                fields.append({
+                    "type": typename,
+                    "name": name,
+                    "options": options,
+                })
+        schema.append({
+            "name": entity_name,
+            "fields": fields,
+            "options": entity_options,
+        })
+    return schema
+
+
+def measure(func, definition):
+    tracemalloc.start()
+    result = func(definition)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def compact_parse(definition):
+    # Ordering is not a part of IR, it only adds temporary graph structures
+    parser = PythonParser()
+    parser.order_by_requisites = list
+    return parser.parse(definition)
+
+
+def main(sizes):
+    print('{0:>8} {1:>12} {2:>12} {3:>7}'.format('entities', 'dicts, KiB', 'slots, KiB', 'ratio'))
+    for size in sizes:
+        definition = high_level_definition(size)
+        legacy = measure(legacy_parse, definition)
+        compact = measure(compact_parse, definition)
+        print('{0:8d} {1:12.1f} {2:12.1f} {3:7.2f}'.format(
+            size, legacy / 1024.0, compact / 1024.0, float(legacy) / compact,
+        ))
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [100, 1000, 10000])
@@ -0,0 +1,71 @@
+"""
+Compares dependency ordering of PythonParser against comparator based sort,
+which was used before topological ordering engine.
+
+    $ python benchmarks/bench_ordering.py 100 1000 10000
+"""
+import sys
+import time
+
+from mutant.parsers.python_parser import PythonParser
+from synthetic import high_level_definition
+
+
+LEGACY_LIMIT = 1000
+LINKS = 4
+
+
+def legacy_order_by_requisites(schema):
+    requisites = PythonParser.collect_requisites(schema)
+    return sorted(schema, key=cmp_by_requisites(requisites))
+
+
+def cmp_by_requisites(requisites):
+    class K(object):
+        def __init__(self, obj, *args):
+            self.obj = obj
+
+        def __lt__(self, other):
+            a, b = self.obj['name'], other.obj['name']
+            if b in recursive_requisites(a):
+                return False
+            elif a in recursive_requisites(b):
+                return True
+            else:
+                return a < b
+
+    def recursive_requisites(name, parents=None):
+        if parents is None:
+            parents = set()
+        result = requisites.get(name, set())
+        more = set()
+        for subname in result:
+            if subname not in parents:
+                more.update(recursive_requisites(subname, result))
+        return result | more
+
+    return K
+
+
+def measure(func, schema):
+    started = time.time()
+    func(schema)
+    return time.time() - started
+
+
+def main(sizes):
+    parser = PythonParser()
+    print('{0:>8} {1:>12} {2:>12}'.format('entities', 'topological', 'comparator'))
+    for size in sizes:
+        definition = high_level_definition(size, links=LINKS)
+        schema = parser.parse(definition)
+        current = measure(parser.order_by_requisites, schema)
+        if size <= LEGACY_LIMIT:
+            legacy = '{0:12.4f}'.format(measure(legacy_order_by_requisites, schema))
+        else:
+            legacy = '{0:>12}'.format('skipped')
+        print('{0:8d} {1:12.4f} {2}'.format(size, current, legacy))
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [100, 1000, 10000])
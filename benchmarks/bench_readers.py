@@ -0,0 +1,48 @@
+"""
+Measures parse time of the same synthetic definition with yaml, json and marshal readers.
+
+    $ python benchmarks/bench_readers.py 1000 5000
+"""
+import io
+import json
+import marshal
+import sys
+import time
+
+import yaml
+
+from mutant.main import create_app
+from synthetic import high_level_definition
+
+
+FORMATS = [
+    ('yaml', lambda data: yaml.safe_dump(data, default_flow_style=False).encode('utf-8')),
+    ('json', lambda data: json.dumps(data).encode('utf-8')),
+    ('marshal', marshal.dumps),
+]
+
+
+def measure(reader, content):
+    app = create_app(reader)
+    app.load_extensions()
+    stream = io.BytesIO(content) if reader == 'marshal' else io.StringIO(content.decode('utf-8'))
+    started = time.time()
+    data = app.readers[reader].read(stream)
+    return time.time() - started, data
+
+
+def main(sizes):
+    print('{0:>6}'.format('size') + ''.join(' {0:>12} {1:>8}'.format(name + ' s', 'KB') for name, _ in FORMATS))
+    for size in sizes:
+        data = high_level_definition(size, lists=0.1)
+        row = '{0:6d}'.format(size)
+        for reader, dump in FORMATS:
+            content = dump(data)
+            elapsed, loaded = measure(reader, content)
+            assert loaded == data
+            row += ' {0:12.4f} {1:8.0f}'.format(elapsed, len(content) / 1024.0)
+        print(row)
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [1000, 5000])
@@ -0,0 +1,66 @@
+"""
+Measures cold start of mutate: wall time of fresh interpreter and
+import time of the slowest modules reported by `python -X importtime` (Python 3.7+).
+
+    $ python benchmarks/bench_startup.py [runs]
+"""
+import os
+import subprocess
+import sys
+import time
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFINITION = os.path.join(HERE, '..', 'tests', 'regression', 'musician', 'definition.yml')
+
+SCENARIOS = (
+    ('import', 'import mutant.main'),
+    ('load plugins', (
+        'from mutant.main import create_app\n'
+        'create_app("yaml", "django", "cerberus").load_extensions()'
+    )),
+    ('mutate', (
+        'from mutant.main import create_app\n'
+        'app = create_app("yaml", "django")\n'
+        'app.parse("yaml", {0!r})\n'
+        'app.mutate("django")'
+    ).format(DEFINITION)),
+)
+
+
+def run(code, importtime=False):
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    started = time.time()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    _, stderr = process.communicate()
+    if process.returncode:
+        raise RuntimeError(stderr.decode('utf-8'))
+    return time.time() - started, stderr.decode('utf-8')
+
+
+def slowest_imports(report, count=5):
+    """
+    Returns modules with the longest cumulative import time in ms.
+    """
+    imports = []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative) / 1000.0, name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main(runs):
+    print('{0:<14} {1:>10} {2:>10}   {3}'.format('scenario', 'best, s', 'median, s', 'slowest imports, ms'))
+    for name, code in SCENARIOS:
+        times = sorted(run(code)[0] for _ in range(runs))
+        _, report = run(code, importtime=True)
+        print('{0:<14} {1:10.3f} {2:10.3f}   {3}'.format(
+            name, times[0], times[len(times) // 2],
+            ', '.join('{0} {1:.1f}'.format(module, ms) for ms, module in slowest_imports(report)),
+        ))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
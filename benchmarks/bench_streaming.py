@@ -0,0 +1,66 @@
+"""
+Compares peak memory and time of rendering Django models
+from YAML definition parsed at once and streamed entity by entity.
+
+    $ python benchmarks/bench_streaming.py 2000 10000
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+from mutant.main import create_app
+from synthetic import human_definition
+
+
+def mutate(path, stream):
+    app = create_app('yaml', 'django')
+    if stream:
+        app.parse_stream('yaml', path)
+    else:
+        app.parse('yaml', path)
+    size = 0
+    for chunk in app.mutate_iter('django'):
+        size += len(chunk)
+    return size
+
+
+def measure(path, stream):
+    started = time.time()
+    size = mutate(path, stream)
+    elapsed = time.time() - started
+    tracemalloc.start()
+    mutate(path, stream)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main(sizes):
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'definition.yml')
+        with open(path, 'w') as fp:
+            yaml.safe_dump(human_definition(10), fp)
+        mutate(path, False)  # Warm up imports
+        print('{0:>6} {1:>8} {2:>10} {3:>10} {4:>12} {5:>12}'.format(
+            'size', 'KB', 'whole s', 'stream s', 'whole MB', 'stream MB'))
+        for size in sizes:
+            with open(path, 'w') as fp:
+                yaml.safe_dump(human_definition(size), fp, default_flow_style=False)
+            whole, whole_peak, expected = measure(path, False)
+            streamed, streamed_peak, output = measure(path, True)
+            assert output == expected
+            print('{0:6d} {1:8.0f} {2:10.3f} {3:10.3f} {4:12.1f} {5:12.1f}'.format(
+                size, os.path.getsize(path) / 1024.0, whole, streamed,
+                whole_peak / 1024.0 / 1024.0, streamed_peak / 1024.0 / 1024.0))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [2000, 10000])
@@ -0,0 +1,35 @@
+"""
+Measures parse throughput of YAML definitions with libyaml and pure-Python loaders.
+
+    $ python benchmarks/bench_yaml_reader.py 1000 5000
+"""
+import sys
+import time
+
+import yaml
+
+from synthetic import high_level_definition
+
+
+def measure(text, loader):
+    started = time.time()
+    data = yaml.load(text, Loader=loader)
+    return time.time() - started, data
+
+
+def main(sizes):
+    loaders = [('python', yaml.SafeLoader)]
+    if hasattr(yaml, 'CSafeLoader'):
+        loaders.append(('libyaml', yaml.CSafeLoader))
+    print('{0:>6} {1:>8}'.format('size', 'MB') + ''.join(' {0:>12}'.format(name + ' MB/s') for name, _ in loaders))
+    for size in sizes:
+        text = yaml.safe_dump(high_level_definition(size, lists=0.1), default_flow_style=False)
+        megabytes = len(text.encode('utf-8')) / 1024.0 / 1024.0
+        results = [measure(text, loader) for _, loader in loaders]
+        assert all(data == results[0][1] for _, data in results)
+        print('{0:6d} {1:8.2f}'.format(size, megabytes) + ''.join(
+            ' {0:12.2f}'.format(megabytes / elapsed) for elapsed, _ in results))
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [1000, 5000])
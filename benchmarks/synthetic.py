@@ -0,0 +1,76 @@
+"""
+Synthetic schema definitions for benchmarks.
+"""
+import random
+
+
+def high_level_definition(size, links=2, lists=0.0, seed=0):
+    """
+    Returns definition in format accepted by `PythonParser.parse`.
+    Every entity links up to `links` previously defined entities,
+    so the requisites graph is acyclic.
+    Fraction `lists` of entities also has a List field.
+    """
+    rnd = random.Random(seed)
+    names = ['Entity{0:05d}'.format(i) for i in range(size)]
+    rnd.shuffle(names)
+    definition = {}
+    for i, name in enumerate(names):
+        fields = [
+            {'title': {'type': 'String', 'max_length': 100}},
+            {'count': {'type': 'Integer'}},
+        ]
+        for j in range(min(i, rnd.randint(0, links))):
+            target = names[rnd.randrange(i)]
+            fields.append({'link{0}'.format(j): {'type': 'Link', 'entity': target}})
+        if i < size - 1 and rnd.random() < lists:
+            target = names[rnd.randrange(i + 1, size)]
+            fields.append({'items': {'type': 'List', 'entity': target}})
+        definition[name] = fields
+    return definition
+
+
+def human_definition(size, links=2, seed=0):
+    """
+    Returns definition in format accepted by `ShorthandMiddleware`.
+    """
+    rnd = random.Random(seed)
+    names = ['Entity{0:05d}'.format(i) for i in range(size)]
+    definition = {}
+    for i, name in enumerate(names):
+        fields = [
+            {'title': {'type': 'String', 'max-length': 100}},
+            {'count': 'Integer'},
+        ]
+        for j in range(min(i, rnd.randint(0, links))):
+            fields.append({'link{0}'.format(j): names[rnd.randrange(i)]})
+        definition[name] = fields
+    return definition
+
+
+def deep_definition(depth, width=4, links=2, seed=0):
+    """
+    Returns definition in format accepted by `PythonParser.parse`.
+    Entities are arranged in `depth` levels of `width` entities,
+    each entity links `links` entities of the next level,
+    last level links the shared `Address` entity.
+    """
+    rnd = random.Random(seed)
+    definition = {
+        'Address': [
+            {'street': {'type': 'String'}},
+            {'city': {'type': 'String'}},
+        ],
+    }
+    for level in range(depth):
+        for i in range(width):
+            fields = [{'title': {'type': 'String'}}]
+            if level == depth - 1:
+                fields.append({'address': {'type': 'Link', 'entity': 'Address'}})
+                fields.append({'addresses': {'type': 'List', 'entity': 'Address'}})
+            else:
+                for j in range(links):
+                    target = 'Level{0}Entity{1}'.format(level + 1, rnd.randrange(width))
+                    fields.append({'link{0}'.format(j): {'type': 'Link', 'entity': target}})
+            definition['Level{0}Entity{1}'.format(level, i)] = fields
+    return definition
@@ -2,11 +2,17 @@
 # -*- coding: utf-8 -*-
 
 
+import os
+import sys
+
 try:
     from setuptools import setup
 except ImportError:
     from distutils.core import setup
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from mutant.plugins import BUILTIN_PLUGINS  # noqa: E402
+
 
 with open('README.rst') as readme_file:
     readme = readme_file.read()
@@ -36,11 +42,16 @@ setup(
         'mutant_yaml',
         'mutant_short',
         'mutant_cerberus',
+        'mutant_json',
+        'mutant_marshal',
     ],
     entry_points={
         'console_scripts': [
             'mutate = mutant.main:main',
         ],
+        'mutant.plugins': [
+            '{0} = {1}'.format(name, module) for name, module in sorted(BUILTIN_PLUGINS.items())
+        ],
     },
     package_dir={'': 'src'},
     include_package_data=True,
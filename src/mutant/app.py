@@ -1,7 +1,15 @@
+import io
 import logging
 import sys
 
+from mutant import includes
+from mutant.cache import definition_digest
+from mutant.incremental import IncrementalRenderer
 from mutant.parsers.python_parser import PythonParser
+from mutant.plugins import load_plugin
+from mutant.profiling import NULL_PROFILER
+from mutant.schema import Schema
+from mutant.streaming import StreamingSchema
 
 
 logger = logging.getLogger(__name__)
@@ -11,15 +19,40 @@ class MutantApp(object):
     """
     App stores all readers, parser middlewares generators.
     All plugins can register themselves on this instance.
+    Plugins required by `require_extension` are loaded on first use of the app.
     And finally it has `parse` and `mutate` methods, that executes mutation.
+    Each step is timed by `profiler` (see `mutant.profiling.Profiler`).
+    Parsed schemas are stored in `schema_cache` (see `mutant.cache.SchemaCache`), if it's set.
     """
 
-    def __init__(self):
+    def __init__(self, profiler=NULL_PROFILER, schema_cache=None):
         self.readers = {}
         self.parser_middlewares = []
         self.generators = {}
         self.generator_extensions = {}
         self.parser = PythonParser()
+        self.profiler = profiler
+        self.schema_cache = schema_cache
+        self.sources = []
+        self.incremental = {}
+        self.pending_extensions = []
+        self.loaded_extensions = set()
+
+    def require_extension(self, name):
+        if name not in self.loaded_extensions and name not in self.pending_extensions:
+            self.pending_extensions.append(name)
+
+    def load_extensions(self):
+        """
+        Loads required plugins, that were not loaded yet.
+        """
+        if not self.pending_extensions:
+            return
+        with self.profiler.stage('load_extensions'):
+            while self.pending_extensions:
+                name = self.pending_extensions.pop(0)
+                load_plugin(self, name)
+                self.loaded_extensions.add(name)
 
     def register_reader(self, name, reader):
         self.readers[name] = reader
@@ -36,34 +69,179 @@ class MutantApp(object):
     def parse(self, reader_name, file_or_name):
         """
         Parsing contains 3 steps:
-        1) Read input file;
+        1) Read input file and files it includes (see `mutant.includes`);
         2) Apply middleware;
         3) Parse schema to internal format.
+        Names of all files, that were read, are collected in `sources`.
         """
-        data = self._read(reader_name, file_or_name)
+        self.load_extensions()
+        profiler = self.profiler
+        self.sources = []
+        key = None
+        if self.schema_cache is not None and not hasattr(file_or_name, 'read') and file_or_name != '-':
+            with profiler.stage('schema_cache'):
+                key = self.schema_cache.key(
+                    definition_digest(file_or_name), self.readers[reader_name], self.parser_middlewares,
+                )
+                entry = self.schema_cache.get(key)
+            if entry is not None:
+                self.sources = [file_or_name] + [source for source, _ in entry['sources']]
+                self.schema = entry['schema']
+                return self.schema
+        with profiler.stage('read:' + reader_name):
+            data = self._read(reader_name, file_or_name)
+            path = None if hasattr(file_or_name, 'read') or file_or_name == '-' else file_or_name
+            data = includes.resolve(self.readers[reader_name], data, path, self.sources)
         for middleware in self.parser_middlewares:
             if hasattr(middleware, 'before_parse'):
-                data = middleware.before_parse(data)
-        schema = self.parser.parse(data)
+                with profiler.stage('before_parse:' + type(middleware).__name__):
+                    data = middleware.before_parse(data)
+        with profiler.stage('parse'):
+            self.parser.profiler = profiler
+            schema = self.parser.parse(data)
         for middleware in reversed(self.parser_middlewares):
             if hasattr(middleware, 'after_parse'):
-                schema = middleware.after_parse(schema)
+                with profiler.stage('after_parse:' + type(middleware).__name__):
+                    schema = middleware.after_parse(schema)
         self.schema = schema
+        if key is not None:
+            self.schema_cache.set(key, schema, self.sources[1:])
         return self.schema
 
-    def mutate(self, generator_name):
-        gen = self.generators[generator_name](self.schema)
+    def mutate(self, generator_name, **options):
+        """
+        Renders parsed schema with generator.
+        Options are passed to generator constructor.
+        """
+        gen = self.create_generator(generator_name, **options)
+        with self.profiler.stage('render:' + generator_name):
+            return gen.render()
+
+    def mutate_incremental(self, generator_name, **options):
+        """
+        Same as `mutate`, but reuses parts of the previous output of the same generator,
+        that do not depend on entities changed since then (see `mutant.incremental`).
+        """
+        gen = self.create_generator(generator_name, **options)
+        with self.profiler.stage('render:' + generator_name):
+            if not hasattr(gen, 'render_parts'):
+                return gen.render()
+            key = (generator_name, tuple(sorted(options.items())))
+            if key not in self.incremental:
+                self.incremental[key] = IncrementalRenderer()
+            return self.incremental[key].render(gen)
+
+    def mutate_iter(self, generator_name, **options):
+        """
+        Same as `mutate`, but yields output in chunks as soon as they are rendered.
+        """
+        gen = self.create_generator(generator_name, **options)
+        if hasattr(gen, 'render_iter'):
+            chunks = gen.render_iter()
+        else:
+            chunks = render_once(gen)
+        return self.profiler.iterate('render:' + generator_name, chunks)
+
+    def mutate_many(self, targets, executor=None):
+        """
+        Renders parsed schema with several generators at once.
+        `targets` is a list of (generator_name, options) pairs.
+        Schema is shared by all generators and must not be changed by them.
+        Generators are run on `executor` (process pool with worker per target by default),
+        returns list of outputs in order of targets.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        self.load_extensions()
+        schema = Schema.of(self.schema)
+        jobs = [
+            (self.generators[name], self.generator_extensions.get(name, []), schema, options)
+            for name, options in targets
+        ]
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=len(jobs))
+        try:
+            with self.profiler.stage('render:' + ','.join(name for name, _ in targets)):
+                futures = [executor.submit(render_generator, *job) for job in jobs]
+                return [future.result() for future in futures]
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+    def create_generator(self, generator_name, **options):
+        self.load_extensions()
+        profiler = self.profiler
+        with profiler.stage('generator:' + generator_name):
+            gen = self.generators[generator_name](self.schema, **options)
         for ext in self.generator_extensions.get(generator_name, []):
-            gen.register_extension(ext)
-        return gen.render()
+            with profiler.stage('extension:' + getattr(ext, '__name__', type(ext).__name__)):
+                gen.register_extension(ext)
+        return gen
+
+    def parse_stream(self, reader_name, file_name):
+        """
+        Parses large definition file entity by entity in two passes (see `mutant.streaming`).
+        Reader must support `iter_entities`, middlewares - `before_parse_stream`,
+        `after_parse` is not applied.
+        Generators, that do not support streamed schema, get it materialized.
+        """
+        self.load_extensions()
+        reader = self.readers[reader_name]
+        if not hasattr(reader, 'iter_entities'):
+            raise ValueError("Reader '{0}' can not read definition entity by entity".format(reader_name))
+        for middleware in self.parser_middlewares:
+            if hasattr(middleware, 'before_parse') and not hasattr(middleware, 'before_parse_stream'):
+                raise ValueError('{0} does not support streaming'.format(type(middleware).__name__))
+        mode = 'rb' if getattr(reader, 'binary', False) else 'r'
+
+        def read():
+            with open(file_name, mode) as fp:
+                for item in includes.iter_entities(reader, reader.iter_entities(fp), file_name, self.sources):
+                    yield item
+
+        self.sources = [file_name]
+        with self.profiler.stage('scan:' + reader_name):
+            self.schema = StreamingSchema(read, self.parser_middlewares, self.parser)
+        return self.schema
+
+    def output_name(self, generator_name):
+        """
+        Default name of generated file.
+        """
+        self.load_extensions()
+        return getattr(self.generators[generator_name], 'output_name', generator_name + '.py')
 
     def _read(self, reader_name, file_or_name):
+        """
+        Readers with `binary` attribute set get files opened in binary mode.
+        """
         reader = self.readers[reader_name]
+        binary = getattr(reader, 'binary', False)
         if hasattr(file_or_name, 'read'):
-            return reader.read(file_or_name)
+            return reader.read(binary_stream(file_or_name) if binary else file_or_name)
         else:
             if file_or_name == '-':
-                return reader.read(sys.stdin)
+                return reader.read(binary_stream(sys.stdin) if binary else sys.stdin)
             else:
-                with open(file_or_name) as fp:
+                self.sources.append(file_or_name)
+                with open(file_or_name, 'rb' if binary else 'r') as fp:
                     return reader.read(fp)
+
+
+def binary_stream(stream):
+    if not isinstance(stream, io.TextIOBase):
+        return stream
+    if hasattr(stream, 'buffer'):
+        return stream.buffer
+    return io.BytesIO(stream.read().encode('utf-8'))
+
+
+def render_once(gen):
+    yield gen.render()
+
+
+def render_generator(generator_class, extensions, schema, options):
+    gen = generator_class(schema, **options)
+    for ext in extensions:
+        gen.register_extension(ext)
+    return gen.render()
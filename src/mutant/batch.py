@@ -0,0 +1,122 @@
+import fnmatch
+import logging
+import os
+import time
+import traceback
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchResult(object):
+    def __init__(self, definition, seconds, outputs=(), error=None):
+        self.definition = definition
+        self.seconds = seconds
+        self.outputs = list(outputs)
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return u'<{0} {1} {2}>'.format(self.__class__.__name__, self.definition, 'ok' if self.ok else 'failed')
+
+
+class BatchConfig(object):
+    """
+    Everything, that is needed to set up an app in worker process.
+    `targets` is a list of (writer, generator options) pairs.
+    """
+
+    def __init__(self, reader, targets, extensions=(), output_root=None):
+        self.reader = reader
+        self.targets = [(writer, dict(options)) for writer, options in targets]
+        self.extensions = list(extensions)
+        self.output_root = output_root
+
+    def key(self):
+        return (self.reader, tuple(writer for writer, _ in self.targets), tuple(self.extensions))
+
+
+def find_definitions(directory, pattern):
+    """
+    Returns sorted paths of files under directory, that match glob pattern.
+    Pattern is matched against path relative to directory, `**/` matches any number of directories.
+    """
+    result = []
+    patterns = [pattern]
+    if pattern.startswith('**/'):
+        patterns.append(pattern[3:])
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in files:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, directory).replace(os.sep, '/')
+            if any(fnmatch.fnmatch(relative, x) for x in patterns):
+                result.append(path)
+    return sorted(result)
+
+
+def output_path(definition, directory, output_root, output_name):
+    """
+    Output goes next to definition, or to the same place in mirrored tree under `output_root`.
+    """
+    definition_dir = os.path.dirname(definition)
+    if output_root is None:
+        return os.path.join(definition_dir, output_name)
+    relative = os.path.relpath(definition_dir, directory)
+    return os.path.normpath(os.path.join(output_root, relative, output_name))
+
+
+_apps = {}
+
+
+def warm_app(config):
+    """
+    Returns app for config, creating it only once per process.
+    """
+    key = config.key()
+    if key not in _apps:
+        from mutant.main import create_app
+        writers = [writer for writer, _ in config.targets]
+        _apps[key] = create_app(config.reader, *(writers + config.extensions))
+    return _apps[key]
+
+
+def mutate_file(config, directory, definition):
+    started = time.time()
+    outputs = []
+    try:
+        app = warm_app(config)
+        app.parse(config.reader, definition)
+        for writer, options in config.targets:
+            path = output_path(definition, directory, config.output_root, app.output_name(writer))
+            output = app.mutate(writer, **options)
+            if not os.path.isdir(os.path.dirname(path) or '.'):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'w') as fp:
+                fp.write(output)
+            outputs.append(path)
+    except Exception:
+        return BatchResult(definition, time.time() - started, outputs, traceback.format_exc())
+    return BatchResult(definition, time.time() - started, outputs)
+
+
+def run_batch(config, directory, definitions, jobs=None):
+    """
+    Mutates definitions on process pool sized to number of CPUs.
+    Yields `BatchResult` for each definition as soon as it's done,
+    failures are reported in results and do not stop the batch.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(mutate_file, config, directory, definition): definition
+            for definition in definitions
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception:
+                yield BatchResult(futures[future], 0.0, error=traceback.format_exc())
@@ -0,0 +1,288 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from six.moves import cPickle as pickle
+
+import mutant
+from mutant.plugins import plugin_module
+
+try:
+    from importlib.util import find_spec
+except ImportError:  # Python 2
+    import imp
+    find_spec = None
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+
+def default_cache_dir():
+    if os.environ.get('MUTANT_CACHE_DIR'):
+        return os.environ['MUTANT_CACHE_DIR']
+    root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(root, 'mutant')
+
+
+class DiskCache(object):
+    """
+    Directory of content-addressed entries with least recently used eviction.
+    Other files read while producing entry (`sources`) are stored with their hashes and checked on lookup.
+    Least recently used entries are evicted, when cache grows over `max_size` bytes.
+    Entries, that can't be loaded (`load_errors`), are ignored.
+    """
+    suffix = '.cache'
+    load_errors = (ValueError,)
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+
+    def get(self, key):
+        """
+        Returns stored entry, or None if there is no valid entry.
+        """
+        path = self.path(key)
+        try:
+            if not self.trusted(path):
+                return None
+            with open(path, 'rb') as fp:
+                data = fp.read()
+        except (IOError, OSError):
+            return None
+        try:
+            entry = self.loads(data)
+        except self.load_errors as exc:
+            logger.warning('Ignoring invalid cache entry %s: %s', path, exc)
+            return None
+        for source, digest in entry['sources']:
+            try:
+                if file_digest(source) != digest:
+                    return None
+            except (IOError, OSError):
+                return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return entry
+
+    def set(self, key, entry, sources=()):
+        entry = dict(entry, sources=[[source, file_digest(source)] for source in sources])
+        path = self.path(key)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path), 0o700)
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(self.dumps(entry))
+        os.rename(temp, path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        total = 0
+        for root, dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(self.suffix):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+        entries.sort()
+        while entries and total > self.max_size:
+            _, size, path = entries.pop(0)
+            logger.debug('Evicting %s from cache', path)
+            os.remove(path)
+            total -= size
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + self.suffix)
+
+    def trusted(self, path):
+        return True
+
+    def dumps(self, entry):
+        raise NotImplementedError()
+
+    def loads(self, data):
+        raise NotImplementedError()
+
+
+class OutputCache(DiskCache):
+    """
+    On-disk cache of generated outputs, that lets CLI skip loading plugins, parsing and rendering,
+    when nothing changed since the last run:
+
+        >>> cache = OutputCache(tempfile.mkdtemp())
+        >>> key = cache.key('definition-sha', 'yaml', ['short', 'yaml', 'django'], 'django', {})
+        >>> cache.get(key) is None
+        True
+        >>> cache.set(key, 'models.py', u'class Author(models.Model): ...')
+        >>> print(cache.get(key)['output'])
+        class Author(models.Model): ...
+
+    Entries are content-addressed: key is a hash of definition content and directory, loaded extensions,
+    generator with its options and versions of mutant and plugin packages.
+    """
+    suffix = '.json'
+
+    def key(self, definition_digest, reader, extensions, generator, options):
+        return make_key(
+            definition_digest,
+            reader,
+            list(extensions),
+            generator,
+            sorted(options.items()),
+            fingerprint(['mutant'] + [plugin_module(name) for name in extensions]),
+        )
+
+    def set(self, key, output_name, output, sources=()):
+        """
+        Stores output of generator. `sources` are file names, that were read in addition to definition.
+        """
+        entry = {'output_name': output_name, 'output': output}
+        super(OutputCache, self).set(key, entry, sources)
+
+    def dumps(self, entry):
+        return json.dumps(entry).encode('utf-8')
+
+    def loads(self, data):
+        return json.loads(data.decode('utf-8'))
+
+
+class SchemaCache(DiskCache):
+    """
+    On-disk cache of parsed schemas (after all parser middlewares).
+    Loading pickled schema skips reading, middlewares and ordering of entities.
+    Unpickling runs code, so entries are loaded only from files and directories,
+    that are owned by user and can't be changed by others.
+    """
+    suffix = '.pickle'
+    load_errors = (pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError)
+
+    def key(self, definition_digest, reader, middlewares):
+        """
+        Key is a hash of definition content and directory, reader and middlewares with versions of their packages.
+        """
+        names = [qualified_name(reader)] + [qualified_name(middleware) for middleware in middlewares]
+        return make_key(
+            definition_digest,
+            names,
+            fingerprint(['mutant'] + sorted(set(name.split('.')[0] for name in names))),
+        )
+
+    def set(self, key, schema, sources=()):
+        super(SchemaCache, self).set(key, {'schema': schema}, sources)
+
+    def dumps(self, entry):
+        return pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+    def trusted(self, path):
+        for checked in (path, os.path.dirname(path), self.directory):
+            if not is_private(checked):
+                logger.warning('Ignoring cache entry %s: %s is not owned by user or is writable by others',
+                               path, checked)
+                return False
+        return True
+
+
+def is_private(path):
+    """
+    Returns True, if file or directory is owned by user and only user can change it.
+    """
+    info = os.stat(path)
+    if not hasattr(os, 'getuid'):  # Windows
+        return True
+    return info.st_uid == os.getuid() and not info.st_mode & 0o022
+
+
+def definition_digest(path):
+    """
+    Digest of definition content and of directory, that files it includes are resolved from:
+    definitions with the same content in different directories may include different files.
+    """
+    return make_key(os.path.dirname(os.path.abspath(path)), file_digest(path))
+
+
+def make_key(*parts):
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+def qualified_name(obj):
+    if not hasattr(obj, '__name__'):
+        obj = type(obj)
+    return '{0}.{1}'.format(obj.__module__, obj.__name__)
+
+
+_fingerprints = {}
+
+
+def fingerprint(package_names):
+    """
+    Versions of packages.
+    Package sources are fingerprinted too, so editing plugin in development checkout invalidates cache.
+    Packages are located without importing them.
+    """
+    return [(name, package_fingerprint(name)) for name in package_names]
+
+
+def package_fingerprint(package_name):
+    if package_name not in _fingerprints:
+        digest = hashlib.sha1(mutant.__version__.encode('utf-8'))
+        for path, name in package_files(package_name):
+            stat = os.stat(path)
+            digest.update('{0}:{1}:{2};'.format(name, stat.st_size, stat.st_mtime).encode('utf-8'))
+        _fingerprints[package_name] = digest.hexdigest()
+    return _fingerprints[package_name]
+
+
+def package_files(package_name):
+    """
+    Returns (path, name relative to package) pairs of Python files of package.
+    Package, that is a single module, has only the module file.
+    """
+    location = package_location(package_name)
+    if location is None:
+        return []
+    if os.path.isfile(location):
+        return [(location, os.path.basename(location))]
+    result = []
+    for root, dirs, files in os.walk(location):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith('.py'):
+                path = os.path.join(root, name)
+                result.append((path, os.path.relpath(path, location)))
+    return result
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for block in iter(lambda: fp.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def package_location(package_name):
+    """
+    Directory of package or file of single module, that is found without importing it.
+    """
+    if find_spec is not None:
+        spec = find_spec(package_name)
+        if spec is None:
+            return None
+        if spec.submodule_search_locations:
+            return list(spec.submodule_search_locations)[0]
+        return spec.origin if spec.origin and os.path.isfile(spec.origin) else None
+    try:
+        return imp.find_module(package_name)[1]
+    except ImportError:
+        return None
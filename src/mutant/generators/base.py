@@ -11,4 +11,11 @@ class UnknownGenerator(KeyError):
 class BaseGenerator(object):
 
     def render(self):
-        raise NotImplemented()
+        raise NotImplementedError()
+
+    def render_iter(self):
+        """
+        Yields rendered output in chunks.
+        Generators, that can produce output incrementally, should override it.
+        """
+        yield self.render()
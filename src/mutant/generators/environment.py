@@ -0,0 +1,66 @@
+"""
+Jinja environment shared by templates of all plugins.
+Templates are registered by name and compiled on first use.
+Compiled bytecode can be cached on disk and reused by other processes (see `use_bytecode_cache`).
+"""
+import logging
+import os
+
+
+logger = logging.getLogger(__name__)
+
+
+TEMPLATES = {}
+
+
+_environment = None
+_bytecode_directory = None
+
+
+def register_template(name, source):
+    if TEMPLATES.get(name, source) != source:
+        raise ValueError('Another template is already registered as {0}'.format(name))
+    TEMPLATES[name] = source
+
+
+def get_template(name):
+    return environment().get_template(name)
+
+
+def environment():
+    global _environment
+    if _environment is None:
+        from jinja2 import DictLoader, Environment
+        _environment = Environment(
+            loader=DictLoader(TEMPLATES),
+            bytecode_cache=bytecode_cache(),
+            # Templates never change while process is running
+            auto_reload=False,
+            cache_size=-1,
+        )
+    return _environment
+
+
+def use_bytecode_cache(directory):
+    """
+    Caches compiled templates in directory, or disables bytecode cache if directory is None.
+    """
+    global _bytecode_directory
+    if directory == _bytecode_directory:
+        return
+    _bytecode_directory = directory
+    if _environment is not None:
+        _environment.bytecode_cache = bytecode_cache()
+
+
+def bytecode_cache():
+    if _bytecode_directory is None:
+        return None
+    from jinja2 import FileSystemBytecodeCache
+    try:
+        if not os.path.isdir(_bytecode_directory):
+            os.makedirs(_bytecode_directory)
+    except OSError as exc:
+        logger.debug('Jinja bytecode cache is disabled: %s', exc)
+        return None
+    return FileSystemBytecodeCache(_bytecode_directory)
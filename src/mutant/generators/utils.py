@@ -1,9 +1,32 @@
 import logging
 
+from mutant.generators.environment import get_template, register_template
+
 
 logger = logging.getLogger(__name__)
 
 
+class LazyTemplate(object):
+    """
+    Template registered in shared Jinja environment (see `mutant.generators.environment`).
+    It's compiled on first render, so jinja2 is imported only by generators, that actually use templates.
+    """
+
+    def __init__(self, name, source):
+        self.name = name
+        self._template = None
+        register_template(name, source)
+
+    @property
+    def template(self):
+        if self._template is None:
+            self._template = get_template(self.name)
+        return self._template
+
+    def render(self, *args, **kwargs):
+        return self.template.render(*args, **kwargs)
+
+
 class JinjaFieldGenerator(object):
     template = None
 
@@ -13,7 +36,7 @@ class JinjaFieldGenerator(object):
 
     @classmethod
     def for_field(cls, field):
-        return cls(name=field['name'], options=field['options'])
+        return cls(name=field['name'], options=dict(field['options']))
 
     def render(self):
         return self.template.render(field_name=self.name, field_type=self.options)
@@ -0,0 +1,104 @@
+import logging
+from contextlib import contextmanager
+
+
+logger = logging.getLogger(__name__)
+
+
+class CodeWriter(object):
+    """
+    Writes lines of code with indentation tracked by the writer:
+
+        >>> writer = CodeWriter()
+        >>> writer.line('class Meta:')
+        >>> with writer.indented():
+        ...     writer.line('abstract = True')
+        >>> print(writer.getvalue())
+        class Meta:
+            abstract = True
+        <BLANKLINE>
+
+    Lines go to `stream` as soon as they are written, if stream is given,
+    otherwise they are collected and returned by `getvalue`.
+    Nested blocks are written once at their final indentation,
+    instead of being rendered and re-indented at each nesting level.
+    """
+
+    def __init__(self, stream=None, indentation='    '):
+        self.stream = stream
+        self.indentation = indentation
+        self.level = 0
+        self.chunks = []
+        self._write = self.chunks.append if stream is None else stream.write
+
+    def line(self, text=''):
+        if text:
+            self._write(self.indentation * self.level + text + '\n')
+        else:
+            self._write('\n')
+
+    def write(self, text):
+        """
+        Writes text as is, without indentation.
+        """
+        self._write(text)
+
+    @contextmanager
+    def indented(self, levels=1):
+        self.level += levels
+        try:
+            yield self
+        finally:
+            self.level -= levels
+
+    def insert(self, fragment, prefix='', suffix=''):
+        """
+        Writes lines recorded by `fragment` at current indentation.
+        `prefix` is prepended to the first line and `suffix` is appended to the last one.
+        """
+        lines = fragment.lines
+        last = len(lines) - 1
+        for i, (level, text) in enumerate(lines):
+            if i == 0:
+                text = prefix + text
+            if i == last:
+                text = text + suffix
+            if text:
+                self._write(self.indentation * (self.level + level) + text + '\n')
+            else:
+                self._write('\n')
+
+    def getvalue(self):
+        return ''.join(self.chunks)
+
+
+class Fragment(CodeWriter):
+    """
+    Records lines with their relative indentation,
+    so they can be inserted into other writers at any indentation later.
+    """
+
+    def __init__(self, indentation='    '):
+        super(Fragment, self).__init__(indentation=indentation)
+        self.lines = []
+
+    def line(self, text=''):
+        self.lines.append((self.level, text))
+
+    def write(self, text):
+        raise TypeError('Fragment records whole lines only')
+
+    def insert(self, fragment, prefix='', suffix=''):
+        lines = fragment.lines
+        last = len(lines) - 1
+        for i, (level, text) in enumerate(lines):
+            if i == 0:
+                text = prefix + text
+            if i == last:
+                text = text + suffix
+            self.lines.append((self.level + level, text))
+
+    def getvalue(self):
+        writer = CodeWriter(indentation=self.indentation)
+        writer.insert(self)
+        return writer.getvalue()
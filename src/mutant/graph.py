@@ -0,0 +1,181 @@
+import heapq
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyGraph(object):
+    """
+    Directed graph of entity names, where each node points to it's requisites.
+    Strongly connected components are found once (Tarjan's algorithm),
+    so cyclic schemas are handled in linear time:
+
+        >>> graph = DependencyGraph(['A', 'B', 'C'], {'A': {'B'}, 'B': {'A'}, 'C': {'A'}})
+        >>> graph.order()
+        ['A', 'B', 'C']
+        >>> graph.cycles()
+        [['A', 'B']]
+
+    Names, that are not listed in `nodes` (like field types), are ignored.
+    """
+
+    def __init__(self, nodes, requisites):
+        self.nodes = sorted(set(nodes))
+        known = set(self.nodes)
+        self.requisites = {
+            node: set(requisites.get(node, ())) & known
+            for node in self.nodes
+        }
+        self.components = self._find_components()
+        self.component_of = {
+            node: index
+            for index, component in enumerate(self.components)
+            for node in component
+        }
+
+    def order(self):
+        """
+        Returns nodes ordered so that every node goes after all of it's requisites.
+        Ties are broken by name, so result is deterministic.
+        Members of one cycle are ordered by name.
+        """
+        blockers = [0] * len(self.components)
+        dependants = [[] for _ in self.components]
+        for index, masters in enumerate(self._condensed()):
+            blockers[index] = len(masters)
+            for master in masters:
+                dependants[master].append(index)
+        ready = [
+            (self.components[index][0], index)
+            for index, count in enumerate(blockers)
+            if count == 0
+        ]
+        heapq.heapify(ready)
+        result = []
+        while ready:
+            _, index = heapq.heappop(ready)
+            result.extend(self.components[index])
+            for dependant in dependants[index]:
+                blockers[dependant] -= 1
+                if blockers[dependant] == 0:
+                    heapq.heappush(ready, (self.components[dependant][0], dependant))
+        return result
+
+    def cycles(self):
+        """
+        Returns list of cycles, each cycle is a sorted list of node names.
+        Node, that requires itself, is a cycle too.
+        """
+        return [
+            component
+            for component in self.components
+            if self.is_cyclic(component[0])
+        ]
+
+    def is_cyclic(self, node):
+        component = self.components[self.component_of[node]]
+        return len(component) > 1 or node in self.requisites[node]
+
+    def _condensed(self):
+        """
+        Returns requisites of each component as sets of component indexes.
+        """
+        condensed = [set() for _ in self.components]
+        for node, masters in self.requisites.items():
+            index = self.component_of[node]
+            for master in masters:
+                condensed[index].add(self.component_of[master])
+            condensed[index].discard(index)
+        return condensed
+
+    def _find_components(self):
+        """
+        Iterative Tarjan's algorithm.
+        Components are returned with requisites first.
+        """
+        index_of = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in self.nodes:
+            if root in index_of:
+                continue
+            work = [(root, iter(sorted(self.requisites[root])))]
+            index_of[root] = lowlink[root] = len(index_of)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, masters = work[-1]
+                for master in masters:
+                    if master not in index_of:
+                        index_of[master] = lowlink[master] = len(index_of)
+                        stack.append(master)
+                        on_stack.add(master)
+                        work.append((master, iter(sorted(self.requisites[master]))))
+                        break
+                    elif master in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[master])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index_of[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(sorted(component))
+        return components
+
+
+class ReachabilityIndex(object):
+    """
+    Transitive closure of `DependencyGraph`.
+    Each node gets integer id and a bitset (python int) of all nodes
+    reachable from it, so reachability questions are answered in O(1):
+
+        >>> index = ReachabilityIndex(DependencyGraph(['A', 'B', 'C'], {'A': {'B'}, 'B': {'C'}}))
+        >>> index.reaches('A', 'C'), index.reaches('C', 'A')
+        (True, False)
+        >>> sorted(index.descendants('A'))
+        ['B', 'C']
+
+    Node reaches itself only if it lies on a cycle.
+    """
+
+    def __init__(self, graph):
+        self.names = graph.nodes
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.bits = {}
+        condensed = graph._condensed()
+        closures = []
+        for index, component in enumerate(graph.components):
+            members = 0
+            for name in component:
+                members |= 1 << self.ids[name]
+            closure = members if graph.is_cyclic(component[0]) else 0
+            for master in condensed[index]:
+                closure |= closures[master]
+            for name in component:
+                self.bits[name] = closure
+            closures.append(closure | members)
+
+    def reaches(self, source, target):
+        return bool(self.bits[source] >> self.ids[target] & 1)
+
+    def descendants(self, name):
+        return self._names(self.bits[name])
+
+    def _names(self, bits):
+        result = set()
+        while bits:
+            low = bits & -bits
+            result.add(self.names[low.bit_length() - 1])
+            bits ^= low
+        return result
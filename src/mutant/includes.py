@@ -0,0 +1,155 @@
+"""
+Definitions can include entities and shorthands from other files:
+
+    INCLUDE:
+        - ../shared/entities.yml
+    SHORTHANDS:
+        INCLUDE: shorthands.yml
+        Pid: {type: String, max-length: 100}
+    Award:
+        - pid: Pid
+
+Top level `INCLUDE` (or `include`) merges entities and shorthands of other definitions,
+`INCLUDE` in `SHORTHANDS` merges files, that contain only shorthands.
+Definition overrides what it includes, paths are relative to the including file.
+
+Included files are read with the same reader and parsed once per process:
+parsed data is reused, while content hash of the file is the same.
+"""
+import hashlib
+import io
+import logging
+import os
+
+from six import string_types
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
+
+logger = logging.getLogger(__name__)
+
+
+INCLUDE_KEYS = ('INCLUDE', 'include')
+
+
+_parsed = {}
+
+
+def resolve(reader, data, path=None, sources=None):
+    """
+    Returns definition data with included files merged in.
+    `path` is the name of definition file (current directory is used for streams),
+    names of included files are appended to `sources`.
+    """
+    return _resolve(reader, data, _directory(path), sources, _stack(path))
+
+
+def iter_entities(reader, entities, path=None, sources=None):
+    """
+    Same as `resolve`, but for (name, fields) pairs of streamed definition (see `mutant.streaming`).
+    Included entities are yielded in place of `INCLUDE`, except for entities and shorthands,
+    that definition has already defined itself. Its own definitions found after `INCLUDE` are yielded later,
+    so they win anyway, as the last definition is used.
+    """
+    directory = _directory(path)
+    stack = _stack(path)
+    own_names = set()
+    own_shorthands = set()
+    for name, fields in entities:
+        if name in INCLUDE_KEYS:
+            for included in _included(reader, fields, directory, sources, stack, _resolve):
+                for included_name, included_fields in included.items():
+                    if included_name == 'SHORTHANDS':
+                        yield included_name, {
+                            key: value
+                            for key, value in included_fields.items()
+                            if key not in own_shorthands
+                        }
+                    elif included_name not in own_names:
+                        yield included_name, included_fields
+        elif name == 'SHORTHANDS':
+            shorthands = _resolve_shorthands(reader, fields, directory, sources, stack)
+            own_shorthands.update(shorthands)
+            yield name, shorthands
+        else:
+            own_names.add(name)
+            yield name, fields
+
+
+def read(reader, path):
+    """
+    Returns parsed content of file, that is parsed only if it has changed since it was read last time.
+    """
+    with open(path, 'rb') as fp:
+        content = fp.read()
+    digest = hashlib.sha256(content).hexdigest()
+    key = (type(reader), path)
+    if key in _parsed and _parsed[key][0] == digest:
+        return _parsed[key][1]
+    logger.debug('Reading included %s', path)
+    stream = io.BytesIO(content)
+    if not getattr(reader, 'binary', False):
+        stream = io.TextIOWrapper(stream)
+    data = reader.read(stream)
+    _parsed[key] = (digest, data)
+    return data
+
+
+def _resolve(reader, data, directory, sources, stack):
+    if not isinstance(data, Mapping):
+        return data
+    result = {}
+    for key in INCLUDE_KEYS:
+        for included in _included(reader, data.get(key), directory, sources, stack, _resolve):
+            _merge(result, included)
+    own = {key: value for key, value in data.items() if key not in INCLUDE_KEYS}
+    if 'SHORTHANDS' in own:
+        own['SHORTHANDS'] = _resolve_shorthands(reader, own['SHORTHANDS'], directory, sources, stack)
+    _merge(result, own)
+    return result
+
+
+def _resolve_shorthands(reader, shorthands, directory, sources, stack):
+    if not isinstance(shorthands, Mapping) or not any(key in shorthands for key in INCLUDE_KEYS):
+        return shorthands
+    result = {}
+    for key in INCLUDE_KEYS:
+        for included in _included(reader, shorthands.get(key), directory, sources, stack, _resolve_shorthands):
+            result.update(included)
+    result.update((key, value) for key, value in shorthands.items() if key not in INCLUDE_KEYS)
+    return result
+
+
+def _included(reader, paths, directory, sources, stack, resolver):
+    if paths is None:
+        return
+    if isinstance(paths, string_types):
+        paths = [paths]
+    for name in paths:
+        path = os.path.normpath(os.path.join(directory, name))
+        if path in stack:
+            raise ValueError('Cyclic include of {0}'.format(path))
+        if sources is not None and path not in sources:
+            sources.append(path)
+        yield resolver(reader, read(reader, path), os.path.dirname(path), sources, stack + (path,))
+
+
+def _merge(result, definition):
+    for key, value in definition.items():
+        if key == 'SHORTHANDS' and key in result:
+            shorthands = dict(result[key])
+            shorthands.update(value)
+            result[key] = shorthands
+        else:
+            result[key] = value
+
+
+def _directory(path):
+    return os.path.dirname(os.path.abspath(path)) if path else os.getcwd()
+
+
+def _stack(path):
+    return (os.path.abspath(path),) if path else ()
@@ -0,0 +1,103 @@
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class Part(object):
+    """
+    Piece of generated output, that is rendered by calling `render`.
+    `key` identifies part between renders and `sources` are names of entities,
+    that rendered text depends on. Part without key is rendered every time.
+    """
+    __slots__ = ('key', 'sources', 'render')
+
+    def __init__(self, key, sources, render):
+        self.key = key
+        self.sources = frozenset(sources) if sources is not None else None
+        self.render = render
+
+    @classmethod
+    def literal(cls, text):
+        return cls(None, None, lambda: text)
+
+    def __repr__(self):
+        return u'<{0} {1}>'.format(self.__class__.__name__, self.key)
+
+
+class IncrementalRenderer(object):
+    """
+    Renders output of generator, that has `render_parts` method,
+    reusing parts of the previous output, which do not depend on changed entities.
+    Part is rendered again if it's new, if it's sources changed,
+    or if any of entities among it's sources was added, removed or changed.
+    Number of rendered and reused parts of the last output is kept in `rendered` and `reused`.
+
+    Only rendering of parts is skipped: generator still builds all parts
+    (Django generator builds renderers of all models, as header imports and transferred
+    foreign keys depend on all of them) and all entities are compared with the previous schema.
+    """
+
+    def __init__(self):
+        self.schema = None
+        self.parts = {}
+        self.rendered = 0
+        self.reused = 0
+
+    def render(self, generator):
+        schema = generator.entities
+        changed = None if self.schema is None else changed_entities(self.schema, schema)
+        chunks = []
+        parts = {}
+        self.rendered = self.reused = 0
+        for part in generator.render_parts():
+            if part.key is None:
+                chunks.append(part.render())
+                continue
+            key = part.key
+            while key in parts:
+                key = (key, 'duplicate')
+            previous = self.parts.get(key)
+            if (changed is not None and previous is not None and
+                    previous[0] == part.sources and not (part.sources & changed)):
+                text = previous[1]
+                self.reused += 1
+            else:
+                text = part.render()
+                self.rendered += 1
+            parts[key] = (part.sources, text)
+            chunks.append(text)
+        logger.debug('Rendered %d parts, reused %d', self.rendered, self.reused)
+        self.schema = schema
+        self.parts = parts
+        return ''.join(chunks)
+
+
+def changed_entities(old, new):
+    """
+    Returns names of entities, that were added, removed or changed between two schemas.
+    """
+    old_entities, old_duplicates = by_name(old)
+    new_entities, new_duplicates = by_name(new)
+    # Built from differences only: set copied from all names keeps the table sized for all of them,
+    # which makes each intersection with part sources walk it
+    changed = set(name for name in old_entities if name not in new_entities)
+    changed.update(name for name in new_entities if name not in old_entities)
+    # Only the first of entities with the same name is compared
+    changed.update(old_duplicates, new_duplicates)
+    for name, entity in new_entities.items():
+        previous = old_entities.get(name)
+        if previous is not None and previous is not entity and previous != entity:
+            changed.add(name)
+    return changed
+
+
+def by_name(entities):
+    result = {}
+    duplicates = set()
+    for entity in entities:
+        if entity['name'] in result:
+            duplicates.add(entity['name'])
+        else:
+            result[entity['name']] = entity
+    return result, duplicates
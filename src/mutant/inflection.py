@@ -0,0 +1,127 @@
+"""
+Process-wide inflection service shared by plugins:
+
+    >>> from mutant import inflection
+    >>> inflection.plural_noun('category')
+    'categories'
+    >>> inflection.singular_noun('posts')
+    'post'
+
+inflect engine is created once, on the first word, that is not memoized yet.
+Results are kept in LRU memo and, if table is enabled by `use_table`,
+in persistent on-disk table, so names known from previous runs cost a dict lookup.
+Table is stamped with fingerprint of inflect package and is dropped, when inflect is changed,
+forms learned first are dropped, when it grows over `table_size` forms.
+"""
+import atexit
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MEMO_SIZE = 4096
+DEFAULT_TABLE_SIZE = 65536
+
+
+class Inflection(object):
+    def __init__(self, memo_size=DEFAULT_MEMO_SIZE, table_size=DEFAULT_TABLE_SIZE):
+        self.memo_size = memo_size
+        self.memo = OrderedDict()
+        self.table_size = table_size
+        self.table = OrderedDict()
+        self.table_path = None
+        self.table_stamp = None
+        self.dirty = False
+        self._engine = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            import inflect
+            self._engine = inflect.engine()
+        return self._engine
+
+    def singular_noun(self, word):
+        """
+        Returns singular form of plural noun, or False if word is not plural.
+        """
+        return self.inflect('singular_noun', word)
+
+    def plural_noun(self, word):
+        return self.inflect('plural_noun', word)
+
+    def inflect(self, method, word):
+        key = method + ':' + word
+        if key in self.table:
+            return self.table[key]
+        try:
+            result = self.memo.pop(key)
+        except KeyError:
+            result = getattr(self.engine, method)(word)
+            if len(self.memo) >= self.memo_size:
+                self.memo.popitem(last=False)
+            if self.table_path is not None:
+                self.table[key] = result
+                self.dirty = True
+        self.memo[key] = result
+        return result
+
+    def use_table(self, path):
+        """
+        Loads table of known forms from file and saves new forms back at exit.
+        """
+        if self.table_path == path:
+            return
+        if self.table_path is None:
+            atexit.register(self.save)
+        self.table_path = path
+        self.table_stamp = engine_stamp()
+        try:
+            with open(path) as fp:
+                data = json.load(fp, object_pairs_hook=OrderedDict)
+        except (IOError, OSError, ValueError) as exc:
+            logger.debug('Inflection table is not loaded: %s', exc)
+            return
+        if not isinstance(data, dict) or data.get('inflect') != self.table_stamp:
+            logger.debug('Inflection table of other inflect version is dropped')
+            return
+        self.table.update(data.get('forms', ()))
+
+    def save(self):
+        if not self.dirty or self.table_path is None:
+            return
+        while len(self.table) > self.table_size:
+            self.table.popitem(last=False)
+        directory = os.path.dirname(self.table_path) or '.'
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as fp:
+                json.dump({'inflect': self.table_stamp, 'forms': self.table}, fp)
+            os.rename(temp, self.table_path)
+        except (IOError, OSError) as exc:
+            logger.debug('Inflection table is not saved: %s', exc)
+            return
+        self.dirty = False
+
+
+def engine_stamp():
+    """
+    Fingerprint of inflect package, that is computed without importing it.
+    """
+    from mutant.cache import package_fingerprint
+    return package_fingerprint('inflect')
+
+
+INFLECTION = Inflection()
+
+
+singular_noun = INFLECTION.singular_noun
+plural_noun = INFLECTION.plural_noun
+use_table = INFLECTION.use_table
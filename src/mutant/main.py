@@ -1,8 +1,21 @@
+import os
 import sys
+import socket
 import argparse
 import logging
-import importlib
+import time
+
+import six
+from six import BytesIO, StringIO
+
 from mutant.app import MutantApp
+from mutant.batch import BatchConfig, find_definitions, run_batch
+from mutant import inflection
+from mutant.cache import DEFAULT_MAX_SIZE, OutputCache, SchemaCache, default_cache_dir, definition_digest
+from mutant.generators.environment import use_bytecode_cache
+from mutant.plugins import load_plugin
+from mutant.profiling import NULL_PROFILER, Profiler
+from mutant.watch import Watcher, write_if_changed
 
 
 logger = logging.getLogger(__name__)
@@ -10,27 +23,333 @@ logger = logging.getLogger(__name__)
 
 def main(*args, **kwargs):
     logging.basicConfig(level=logging.DEBUG)
-    options = parse_cli_options()
-    app = create_app(options.reader, options.writer, *options.extension)
-    app.parse(options.reader, options.definition)
-    sys.stdout.write(app.mutate(options.writer))
+    argv = sys.argv[1:]
+    options = parse_cli_options(argv)
+    if options.serve:
+        from mutant.server import default_socket_path, serve
+        return serve(options.socket or default_socket_path())
+    stdin = None
+    if not (options.watch or options.no_daemon) and daemon_supported():
+        from mutant.server import default_socket_path, forward
+        if options.definition == '-':
+            stdin = read_stdin()
+        if not isinstance(stdin, BytesIO):
+            if not options.cache_dir:
+                # Daemon would find default cache directory in it's own environment
+                argv = argv + ['--cache-dir', default_cache_dir()]
+            code = forward(argv, options.socket or default_socket_path(), stdin.getvalue() if stdin else None)
+            if code is not None:
+                return code
+    return run(options, stdin)
+
+
+def daemon_supported():
+    """
+    Daemon listens on Unix socket, that only user can access, so it's not available on Windows.
+    """
+    return hasattr(socket, 'AF_UNIX') and hasattr(os, 'getuid')
+
+
+def read_stdin():
+    """
+    Reads standard input to be sent to daemon.
+    Input, that is not UTF-8 text (like marshal definitions), can be read only locally.
+    """
+    data = getattr(sys.stdin, 'buffer', sys.stdin).read()
+    if isinstance(data, six.text_type):
+        return StringIO(data)
+    try:
+        return StringIO(data.decode('utf-8'))
+    except UnicodeDecodeError:
+        return BytesIO(data)
+
+
+def run(options, stdin=None, stdout=None, stderr=None, app_factory=None):
+    """
+    Executes command line options.
+    Standard streams can be replaced with other files,
+    `app_factory` creates app with given extensions (`create_app` by default).
+    Returns exit code.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    app_factory = app_factory or create_app
+    profiler = create_profiler(options)
+    writers = options.writer.split(',')
+    use_bytecode_cache(None if options.no_cache else cache_dir(options, 'jinja'))
+    if options.batch:
+        return mutate_batch(writers, options, stderr)
+    if options.watch:
+        return watch(writers, options)
+    extension_names = [options.reader] + writers + options.extension
+    cache = create_cache(options)
+    if cache is not None:
+        with profiler.stage('cache'):
+            digest = definition_digest(options.definition)
+            keys = [
+                cache.key(
+                    digest, options.reader, app_extensions(*extension_names),
+                    writer, generator_options(options.option, writer),
+                )
+                for writer in writers
+            ]
+            entries = [cache.get(key) for key in keys]
+        if all(entries):
+            logger.debug('Using cached output')
+            write_cached(entries, options, stdout)
+            report_profile(profiler, options, stderr)
+            return 0
+    if cache is not None:
+        inflection.use_table(cache_dir(options, 'inflections.json'))
+    # Plugins are loaded on first use, after cached output turned out to be missing
+    app = app_factory(*extension_names)
+    app.profiler = profiler
+    app.schema_cache = create_schema_cache(options) if cache is not None else None
+    if options.stream:
+        app.parse_stream(options.reader, options.definition)
+    else:
+        app.parse(options.reader, stdin if options.definition == '-' else options.definition)
+    if len(writers) == 1:
+        chunks = app.mutate_iter(writers[0], **generator_options(options.option, writers[0]))
+        collected = []
+        if cache is not None:
+            chunks = collect_chunks(chunks, collected)
+        if options.output:
+            with open(options.output, 'w') as fp:
+                write_chunks(fp, chunks)
+        else:
+            write_chunks(stdout, chunks)
+        outputs = [''.join(collected)]
+    else:
+        outputs = mutate_many(app, writers, options)
+    if cache is not None:
+        sources = [source for source in app.sources if source != options.definition]
+        for key, writer, output in zip(keys, writers, outputs):
+            cache.set(key, app.output_name(writer), output, sources)
+    report_profile(profiler, options, stderr)
+    return 0
+
+
+def mutate_many(app, writers, options):
+    """
+    Renders all writers from single parsed schema to files in output directory.
+    """
+    targets = [(writer, generator_options(options.option, writer)) for writer in writers]
+    if options.jobs == 1:
+        outputs = [app.mutate(writer, **writer_options) for writer, writer_options in targets]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=options.jobs or len(targets))
+        with executor:
+            outputs = app.mutate_many(targets, executor)
+    if not os.path.isdir(options.output):
+        os.makedirs(options.output)
+    for writer, output in zip(writers, outputs):
+        with open(os.path.join(options.output, app.output_name(writer)), 'w') as fp:
+            fp.write(output)
+    return outputs
+
+
+def watch(writers, options):
+    """
+    Regenerates outputs whenever content of definition or any other file read by parser changes.
+    Plugins are loaded once, only models affected by the change are rendered again
+    and output files are rewritten only when generated code differs.
+    """
+    app = create_app(options.reader, *(writers + options.extension))
+    targets = [(writer, generator_options(options.option, writer)) for writer in writers]
+    watcher = Watcher(options.watch_interval)
+    watcher.watch([options.definition])
+    try:
+        while True:
+            try:
+                app.parse(options.reader, options.definition)
+                for (writer, writer_options), path in zip(targets, output_paths(app, writers, options)):
+                    if write_if_changed(path, app.mutate_incremental(writer, **writer_options)):
+                        logger.info('Updated %s', path)
+                    else:
+                        logger.info('%s is up to date', path)
+            except Exception:
+                logger.exception('Failed to mutate %s', options.definition)
+            watcher.watch([options.definition] + app.sources)
+            logger.info('Watching %s', ', '.join(sorted(watcher.states)))
+            watcher.wait()
+    except KeyboardInterrupt:
+        return 0
+
+
+def output_paths(app, writers, options):
+    """
+    Output is a file for single writer or a directory with default file names for several writers.
+    """
+    if len(writers) == 1:
+        return [options.output]
+    if not os.path.isdir(options.output):
+        os.makedirs(options.output)
+    return [os.path.join(options.output, app.output_name(writer)) for writer in writers]
+
+
+def create_cache(options):
+    if options.no_cache or options.definition == '-':
+        return None
+    return OutputCache(cache_dir(options, 'output'), options.cache_size * 1024 * 1024)
+
+
+def create_schema_cache(options):
+    return SchemaCache(cache_dir(options, 'schema'), options.cache_size * 1024 * 1024)
+
+
+def cache_dir(options, name):
+    return os.path.join(options.cache_dir or default_cache_dir(), name)
+
+
+def write_cached(entries, options, stdout):
+    if len(entries) == 1:
+        if options.output:
+            with open(options.output, 'w') as fp:
+                fp.write(entries[0]['output'])
+        else:
+            stdout.write(entries[0]['output'])
+        return
+    if not os.path.isdir(options.output):
+        os.makedirs(options.output)
+    for entry in entries:
+        with open(os.path.join(options.output, entry['output_name']), 'w') as fp:
+            fp.write(entry['output'])
+
+
+def mutate_batch(writers, options, stderr):
+    """
+    Mutates all definitions found in directory, reports timing and failures to stderr.
+    Returns exit code: 0 if all definitions were mutated and 1 otherwise.
+    """
+    config = BatchConfig(
+        options.reader,
+        [(writer, generator_options(options.option, writer)) for writer in writers],
+        options.extension,
+        options.output,
+    )
+    definitions = find_definitions(options.batch, options.glob)
+    failed = 0
+    started = time.time()
+    for result in run_batch(config, options.batch, definitions, options.jobs):
+        if result.ok:
+            stderr.write('ok     {0:8.3f}s {1}\n'.format(result.seconds, result.definition))
+        else:
+            failed += 1
+            stderr.write('FAILED {0:8.3f}s {1}\n{2}\n'.format(result.seconds, result.definition, result.error))
+    stderr.write('{0} definitions, {1} failed in {2:.3f}s\n'.format(
+        len(definitions), failed, time.time() - started,
+    ))
+    return 1 if failed else 0
+
+
+def create_profiler(options):
+    if options.profile or options.profile_json or options.profile_stats or options.profile_memory:
+        return Profiler(stats_dir=options.profile_stats, memory=options.profile_memory)
+    return NULL_PROFILER
+
+
+def report_profile(profiler, options, stderr):
+    if not profiler.enabled:
+        return
+    stderr.write(profiler.report())
+    if options.profile_json:
+        with open(options.profile_json, 'w') as fp:
+            profiler.dump_json(fp)
+
+
+def write_chunks(stream, chunks):
+    for chunk in chunks:
+        stream.write(chunk)
+
+
+def collect_chunks(chunks, collected):
+    for chunk in chunks:
+        collected.append(chunk)
+        yield chunk
 
 
 def create_app(*extension_names):
+    """
+    Creates app with required extensions, they are loaded on first use (see `mutant.plugins`).
+    """
     app = MutantApp()
-    load_extension(app, 'short')
-    for name in extension_names:
-        load_extension(app, name)
+    for name in app_extensions(*extension_names):
+        app.require_extension(name)
     return app
 
 
+def app_extensions(*extension_names):
+    """
+    Names of all extensions loaded by `create_app`.
+    """
+    return ['short'] + list(extension_names)
+
+
 def load_extension(app, name):
-    package_name = 'mutant_' + name
-    package = importlib.import_module(package_name)
-    package.register(app)
+    load_plugin(app, name)
+
+
+def generator_options(pairs, writer=None):
+    """
+    Options look like NAME=VALUE for all writers or WRITER.NAME=VALUE for one of them.
+    """
+    result = {}
+    for pair in pairs:
+        name, sep, value = pair.partition('=')
+        if not sep:
+            raise ValueError('Generator option must look like NAME=VALUE, got: {0}'.format(pair))
+        prefix, dot, option = name.rpartition('.')
+        if not dot or prefix == writer:
+            result[option] = value
+    return result
+
+
+def scoped_generator_options(pairs, option_names):
+    """
+    Returns options as WRITER.NAME=VALUE pairs, option without writer goes to all writers, that accept it.
+    `option_names` maps writer to names of options it accepts (None if it does not declare them).
+    Raises ValueError for option, that is not accepted.
+    """
+    result = []
+    for pair in pairs:
+        name, _, value = pair.partition('=')
+        prefix, dot, option = name.rpartition('.')
+        if dot:
+            writers = [prefix]
+            if prefix in option_names and not accepts(option_names[prefix], option):
+                raise ValueError("Writer '{0}' has no option '{1}'".format(prefix, option))
+        else:
+            writers = [writer for writer in option_names if accepts(option_names[writer], option)]
+            if not writers:
+                raise ValueError("None of writers has option '{0}'".format(option))
+        result.extend('{0}.{1}={2}'.format(writer, option, value) for writer in writers)
+    return result
+
 
+def accepts(option_names, option):
+    return option_names is None or option in option_names
 
-def parse_cli_options():
+
+def writer_option_names(writers, extension_names=()):
+    """
+    Maps writers to names of options their generators accept, plugins of writers are loaded to find out.
+    """
+    app = MutantApp()
+    for name in writers + list(extension_names):
+        app.require_extension(name)
+    app.load_extensions()
+    result = {}
+    for writer in writers:
+        if writer not in app.generators:
+            raise ValueError("Unknown writer '{0}'".format(writer))
+        result[writer] = getattr(app.generators[writer], 'option_names', None)
+    return result
+
+
+def parse_cli_options(argv=None):
     parser = argparse.ArgumentParser(description='Process some integers.')
     parser.add_argument(
         '--reader',
@@ -38,28 +357,136 @@ def parse_cli_options():
         help='Name of reader to parse input file (default: yaml)',
     )
     parser.add_argument(
-        'writer',
-        help='Name of writer to generate output file',
+        'writer', nargs='?',
+        help='Name of writer to generate output file, or comma separated names of several writers',
     )
     parser.add_argument(
-        'definition',
+        'definition', nargs='?',
         help='Definition file name or "-" for stdin',
     )
     parser.add_argument(
-        '-e', '--extension', nargs='+',
+        '--batch', metavar='DIR',
+        help='Mutate all definitions found in directory, outputs are written next to definitions '
+             'or to the mirrored tree in output directory (-o)',
+    )
+    parser.add_argument(
+        '--glob', default='**/definition.yml',
+        help='Pattern of definition file names for batch mode (default: **/definition.yml)',
+    )
+    parser.add_argument(
+        '-o', '--output',
+        help='Output file name (default: stdout), or output directory for several writers',
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int,
+        help='Number of processes to render several writers (default: one per writer) '
+             'or to mutate definitions in batch mode (default: number of CPUs)',
+    )
+    parser.add_argument(
+        '-e', '--extension', nargs='+', default=[],
         help='Name of extension',
     )
-    return parser.parse_args()
+    parser.add_argument(
+        '-O', '--option', action='append', default=[], metavar='NAME=VALUE',
+        help='Generator option, e.g. mode=registry (for all writers, that accept it) or cerberus.mode=registry',
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        help='Read large definition file entity by entity in two passes, '
+             'Django models are rendered without keeping whole schema in memory',
+    )
+    parser.add_argument(
+        '--watch', action='store_true',
+        help='Keep running and regenerate output (-o) whenever definition changes',
+    )
+    parser.add_argument(
+        '--watch-interval', type=float, default=0.5, metavar='SECONDS',
+        help='How often watched files are checked for changes (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--serve', action='store_true',
+        help='Run daemon, that keeps plugins loaded and executes requests of mutate commands',
+    )
+    parser.add_argument(
+        '--socket', metavar='PATH',
+        help='Unix socket of daemon (default: $MUTANT_SOCKET, $XDG_RUNTIME_DIR/mutant.sock '
+             'or mutant.sock in private mutant-UID directory in temporary directory)',
+    )
+    parser.add_argument(
+        '--no-daemon', action='store_true',
+        help='Do not forward request to daemon, even if it is running',
+    )
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help='Do not use cached output and parsed schema, always parse and render definition',
+    )
+    parser.add_argument(
+        '--cache-dir', metavar='DIR',
+        help='Directory of output, schema and template caches (default: $MUTANT_CACHE_DIR or ~/.cache/mutant)',
+    )
+    parser.add_argument(
+        '--cache-size', type=int, default=DEFAULT_MAX_SIZE // (1024 * 1024), metavar='MB',
+        help='Maximum size of output cache and of schema cache (each), least recently used entries are evicted '
+             '(default: %(default)s)',
+    )
+    parser.add_argument(
+        '--profile', action='store_true',
+        help='Print timing of each stage to stderr',
+    )
+    parser.add_argument(
+        '--profile-json', metavar='FILE',
+        help='Write timing of each stage to JSON file',
+    )
+    parser.add_argument(
+        '--profile-stats', metavar='DIR',
+        help='Dump cProfile stats of each stage to directory',
+    )
+    parser.add_argument(
+        '--profile-memory', action='store_true',
+        help='Measure peak memory of each stage with tracemalloc',
+    )
+    options = parser.parse_args(argv)
+    if options.serve:
+        if not daemon_supported():
+            parser.error('Daemon is not supported on this platform')
+        return options
+    if not options.writer:
+        parser.error('Writer is required')
+    for pair in options.option:
+        if '=' not in pair:
+            parser.error('Generator option must look like NAME=VALUE or WRITER.NAME=VALUE, got: {0}'.format(pair))
+    if options.batch:
+        if options.definition:
+            parser.error('Definition can not be used with --batch')
+        if options.stream:
+            parser.error('Streaming mode can not be used with --batch')
+    elif not options.definition:
+        parser.error('Definition file name is required')
+    elif options.stream and (options.definition == '-' or options.watch):
+        parser.error('Streaming mode requires definition file name and can not be used with --watch')
+    elif options.watch and (options.definition == '-' or not options.output):
+        parser.error('Watch mode requires definition file name and output (-o)')
+    elif ',' in options.writer and not options.output:
+        parser.error('Output directory (-o) is required for several writers')
+    if options.option:
+        writers = options.writer.split(',')
+        try:
+            options.option = scoped_generator_options(
+                options.option, writer_option_names(writers, options.extension),
+            )
+        except ValueError as exc:
+            parser.error(str(exc))
+    return options
 
 
-def yaml_to_django(definition='definition.yml'):
+def yaml_to_django(definition='definition.yml', **options):
     app = MutantApp()
     app = create_app('yaml', 'django')
     app.parse('yaml', definition)
-    return app.mutate('django')
+    return app.mutate('django', **options)
 
 
-def yaml_to_cerberus(definition='definition.yml'):
+def yaml_to_cerberus(definition='definition.yml', **options):
     app = create_app('yaml', 'cerberus')
     app.parse('yaml', definition)
-    return app.mutate('cerberus')
+    return app.mutate('cerberus', **options)
@@ -1,5 +1,9 @@
 import logging
 
+from mutant.graph import DependencyGraph
+from mutant.profiling import NULL_PROFILER
+from mutant.schema import Entity, Field, OptionsPool, Schema, collect_requisites
+
 
 logger = logging.getLogger(__name__)
 
@@ -42,90 +46,53 @@ class PythonParser(object):
                 'options': {},
             },
         ]
+
+    Entities and fields are `Entity` and `Field` records, that read like plain dicts.
     """
+    profiler = NULL_PROFILER
 
     def parse(self, definition):
         logger.debug(definition)
 
-        schema = []
-        for entity_name, field_defs in definition.items():
-            fields = []
-            entity_options = []
-            for data in field_defs:
-                assert len(data) == 1
-                name, parameters = next(iter(data.items()))
-                if name == 'OPTIONS':
-                    entity_options = parameters
-                else:
-                    fields.append(self.define_field(name, parameters))
-            entity = {
-                "name": entity_name,
-                "fields": fields,
-                "options": entity_options,
-            }
-            schema.append(entity)
-        return self.order_by_requisites(schema)
+        pool = OptionsPool()
+        schema = [
+            self.define_entity(entity_name, field_defs, pool)
+            for entity_name, field_defs in definition.items()
+        ]
+        with self.profiler.stage('order'):
+            return self.order_by_requisites(schema)
+
+    def define_entity(self, entity_name, field_defs, pool=None):
+        if pool is None:
+            pool = OptionsPool()
+        fields = []
+        entity_options = []
+        for data in field_defs:
+            assert len(data) == 1
+            name, parameters = next(iter(data.items()))
+            if name == 'OPTIONS':
+                entity_options = [pool.options(option) for option in parameters]
+            else:
+                fields.append(self.define_field(name, parameters, pool))
+        return Entity(entity_name, fields, entity_options)
 
     @staticmethod
-    def define_field(name, parameters):
+    def define_field(name, parameters, pool=None):
         options = dict(parameters)
         typename = options.pop('type')
-        return {
-            "type": typename,
-            "name": name,
-            "options": options,
-        }
+        if pool is None:
+            pool = OptionsPool()
+        return Field(name, typename, pool.options(options))
 
     @classmethod
     def order_by_requisites(cls, schema):
-        requisites = cls.collect_requisites(schema)
-        return sorted(schema, key=cmp_by_requisites(requisites))
+        by_name = {entity['name']: entity for entity in schema}
+        graph = DependencyGraph(by_name, cls.collect_requisites(schema))
+        for cycle in graph.cycles():
+            logger.info('Cyclic requisites: %s', ', '.join(cycle))
+        return Schema([by_name[name] for name in graph.order()], requisites=graph)
 
-    @staticmethod
-    def collect_requisites(schema):
-        requisites = {}
-        for entity in schema:
-            for field in entity['fields']:
-                master = field['type']
-                dependant = entity['name']
-                requisites.setdefault(dependant, set()).add(master)
-                if 'entity' in field['options']:
-                    if field['type'] == 'Link':
-                        master = field['options']['entity']
-                        dependant = entity['name']
-                    elif field['type'] == 'List':
-                        master = entity['name']
-                        dependant = field['options']['entity']
-                    requisites.setdefault(dependant, set()).add(master)
-        return requisites
-
-
-def cmp_by_requisites(requisites):
-    class K(object):
-        def __init__(self, obj, *args):
-            self.obj = obj
-
-        def __lt__(self, other):
-            a, b = self.obj['name'], other.obj['name']
-            logger.debug('Compare %s to %s', a, b)
-            if b in recursive_requisites(a):
-                return False
-            elif a in recursive_requisites(b):
-                return True
-            else:
-                return a < b
-
-    def recursive_requisites(name, parents=None):
-        if parents is None:
-            parents = set()
-        result = requisites.get(name, set())
-        more = set()
-        for subname in result:
-            if subname not in parents:
-                more.update(recursive_requisites(subname, result))
-        return result | more
-
-    return K
+    collect_requisites = staticmethod(collect_requisites)
 
 
 def register(app):
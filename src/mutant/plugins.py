@@ -0,0 +1,73 @@
+"""
+Plugins are packages with `register(app)` function.
+Plugin module is found by name without importing anything:
+builtin plugins are listed in `BUILTIN_PLUGINS` (setup.py declares entry points from it),
+other plugins are looked up in `mutant.plugins` entry points group and then by `mutant_<name>` naming convention.
+"""
+import importlib
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+ENTRY_POINT_GROUP = 'mutant.plugins'
+
+
+BUILTIN_PLUGINS = {
+    'cerberus': 'mutant_cerberus',
+    'django': 'mutant_django',
+    'django_json': 'mutant_django_json',
+    'json': 'mutant_json',
+    'marshal': 'mutant_marshal',
+    'short': 'mutant_short',
+    'yaml': 'mutant_yaml',
+}
+
+
+_entry_points = None
+
+
+def plugin_module(name):
+    if name in BUILTIN_PLUGINS:
+        return BUILTIN_PLUGINS[name]
+    return entry_points().get(name, 'mutant_' + name)
+
+
+def load_plugin(app, name):
+    module_name = plugin_module(name)
+    logger.debug('Loading plugin %s from %s', name, module_name)
+    importlib.import_module(module_name).register(app)
+
+
+def entry_points():
+    """
+    Maps plugin names to modules declared in entry points of installed distributions.
+    Distributions are scanned once, only when plugin is not builtin.
+    """
+    global _entry_points
+    if _entry_points is None:
+        _entry_points = {}
+        for name, value in _iter_entry_points():
+            _entry_points[name] = value.split(':')[0].strip()
+    return _entry_points
+
+
+def _iter_entry_points():
+    try:
+        from importlib import metadata
+    except ImportError:  # Python < 3.8
+        try:
+            import pkg_resources
+        except ImportError:
+            return
+        for entry_point in pkg_resources.iter_entry_points(ENTRY_POINT_GROUP):
+            yield entry_point.name, entry_point.module_name
+        return
+    found = metadata.entry_points()
+    if hasattr(found, 'select'):
+        found = found.select(group=ENTRY_POINT_GROUP)
+    else:
+        found = found.get(ENTRY_POINT_GROUP, [])
+    for entry_point in found:
+        yield entry_point.name, entry_point.value
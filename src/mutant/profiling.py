@@ -0,0 +1,211 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import cProfile
+except ImportError:  # pragma: no cover
+    cProfile = None
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class StageRecord(object):
+    def __init__(self, name, depth, seconds, peak_memory=None, stats_file=None, index=0):
+        self.index = index
+        self.name = name
+        self.depth = depth
+        self.seconds = seconds
+        self.peak_memory = peak_memory
+        self.stats_file = stats_file
+        self.cprofile = None
+        self.started = None
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'depth': self.depth,
+            'seconds': self.seconds,
+            'peak_memory': self.peak_memory,
+            'stats_file': self.stats_file,
+        }
+
+    def __repr__(self):
+        return u'<{0} {1} {2:.6f}>'.format(self.__class__.__name__, self.name, self.seconds)
+
+
+class Profiler(object):
+    """
+    Measures wall time of pipeline stages:
+
+        >>> profiler = Profiler()
+        >>> with profiler.stage('parse'):
+        ...     with profiler.stage('order'):
+        ...         pass
+        >>> [record.name for record in profiler.records]
+        ['parse/order', 'parse']
+
+    Hooks are called with each finished `StageRecord`.
+    Optionally top level stages are profiled by cProfile (stats are dumped to `stats_dir`)
+    and their peak memory is measured with tracemalloc.
+    """
+    enabled = True
+
+    def __init__(self, stats_dir=None, memory=False):
+        self.stats_dir = stats_dir
+        self.memory = memory and tracemalloc is not None
+        self.records = []
+        self.hooks = []
+        self.path = []
+        self.started = time.time()
+        self.counter = 0
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    @contextmanager
+    def stage(self, name):
+        record = self._start(name)
+        self.path.append(name)
+        self._resume(record)
+        try:
+            yield
+        finally:
+            self._pause(record)
+            self.path.pop()
+            self._stop(record)
+
+    def iterate(self, name, iterable):
+        """
+        Yields from iterable, accounting time spent in it to the stage `name`.
+        Used for lazily rendered output, that is consumed by caller chunk by chunk.
+        """
+        iterator = iter(iterable)
+        record = self._start(name)
+        try:
+            while True:
+                self._resume(record)
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self._pause(record)
+                yield chunk
+        finally:
+            self._stop(record)
+
+    def _start(self, name):
+        record = StageRecord('/'.join(self.path + [name]), len(self.path), 0.0, index=self.counter)
+        self.counter += 1
+        if record.depth == 0 and self.stats_dir and cProfile:
+            record.cprofile = cProfile.Profile()
+        if record.depth == 0 and self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.clear_traces()
+        return record
+
+    def _resume(self, record):
+        if record.cprofile is not None:
+            record.cprofile.enable()
+        record.started = time.time()
+
+    def _pause(self, record):
+        record.seconds += time.time() - record.started
+        if record.cprofile is not None:
+            record.cprofile.disable()
+
+    def _stop(self, record):
+        if record.depth == 0 and self.memory:
+            record.peak_memory = tracemalloc.get_traced_memory()[1]
+        if record.cprofile is not None:
+            record.stats_file = self._dump_stats(record.cprofile, record.name)
+            record.cprofile = None
+        self.finish(record)
+
+    def finish(self, record):
+        self.records.append(record)
+        for hook in self.hooks:
+            hook(record)
+
+    def totals(self):
+        """
+        Returns records with the same name summed up, in order of their first start.
+        """
+        totals = {}
+        for record in sorted(self.records, key=lambda x: x.index):
+            if record.name not in totals:
+                totals[record.name] = StageRecord(record.name, record.depth, 0.0, index=record.index)
+            total = totals[record.name]
+            total.seconds += record.seconds
+            if record.peak_memory is not None:
+                total.peak_memory = max(total.peak_memory or 0, record.peak_memory)
+            total.stats_file = total.stats_file or record.stats_file
+        return sorted(totals.values(), key=lambda x: x.index)
+
+    def report(self):
+        lines = ['{0:<48} {1:>10} {2:>12}'.format('stage', 'seconds', 'peak memory')]
+        for record in self.totals():
+            lines.append('{0:<48} {1:10.4f} {2:>12}'.format(
+                '  ' * record.depth + record.name.split('/')[-1],
+                record.seconds,
+                '' if record.peak_memory is None else record.peak_memory,
+            ))
+        lines.append('{0:<48} {1:10.4f}'.format('total', time.time() - self.started))
+        return '\n'.join(lines) + '\n'
+
+    def as_dict(self):
+        return {
+            'stages': [record.as_dict() for record in self.totals()],
+            'total': time.time() - self.started,
+        }
+
+    def dump_json(self, fp):
+        json.dump(self.as_dict(), fp, indent=2, sort_keys=True)
+
+    def _dump_stats(self, cprofile, name):
+        if not os.path.isdir(self.stats_dir):
+            os.makedirs(self.stats_dir)
+        path = os.path.join(
+            self.stats_dir,
+            '{0:03d}-{1}.prof'.format(len(self.records), name.replace('/', '_').replace(':', '_')),
+        )
+        cprofile.dump_stats(path)
+        return path
+
+
+class NullStage(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullProfiler(object):
+    """
+    Profiler, that does nothing. Used by default to keep instrumentation overhead negligible.
+    """
+    enabled = False
+    _stage = NullStage()
+
+    def stage(self, name):
+        return self._stage
+
+    def iterate(self, name, iterable):
+        return iterable
+
+    def add_hook(self, hook):
+        raise TypeError('Profiling is disabled')
+
+
+NULL_PROFILER = NullProfiler()
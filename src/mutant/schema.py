@@ -0,0 +1,230 @@
+import logging
+
+from six.moves import intern
+
+from mutant.graph import DependencyGraph, ReachabilityIndex
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
+
+logger = logging.getLogger(__name__)
+
+
+class Schema(list):
+    """
+    Parsed schema - list of entities ordered by requisites.
+    Graph indexes are built once on first access and shared by all generators,
+    so schema must not be changed after it was handed to them.
+
+    `entity` looks up entity by name.
+    `embedding` answers what entity transitively links through Link and List fields.
+    """
+
+    def __init__(self, entities=(), requisites=None):
+        super(Schema, self).__init__(entities)
+        self._requisites = requisites
+        self._embedding = None
+        self._index = None
+        self._links = None
+
+    @classmethod
+    def of(cls, entities):
+        if isinstance(entities, cls):
+            return entities
+        if hasattr(entities, 'materialize'):
+            return entities.materialize()
+        return cls(entities)
+
+    @property
+    def names(self):
+        return [entity['name'] for entity in self]
+
+    def entity(self, name):
+        """
+        Returns entity by name, raises KeyError for unknown name.
+        """
+        if self._index is None:
+            self._index = {}
+            for entity in self:
+                self._index.setdefault(entity['name'], entity)
+        return self._index[name]
+
+    def __contains__(self, name):
+        if isinstance(name, Mapping):
+            return super(Schema, self).__contains__(name)
+        try:
+            self.entity(name)
+        except KeyError:
+            return False
+        return True
+
+    @property
+    def links(self):
+        """
+        Maps entity name to set of entity names it links by Link and List fields.
+        """
+        if self._links is None:
+            self._links = collect_links(self)
+        return self._links
+
+    @property
+    def requisites(self):
+        if self._requisites is None:
+            self._requisites = DependencyGraph(self.names, collect_requisites(self))
+        return self._requisites
+
+    @property
+    def embedding(self):
+        if self._embedding is None:
+            self._embedding = ReachabilityIndex(DependencyGraph(self.names, self.links))
+        return self._embedding
+
+
+class Record(Mapping):
+    """
+    Read-only dict-like view of `__slots__`,
+    so records can be used wherever plain dicts were used before.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __eq__(self, other):
+        # Compares slots directly instead of generic item by item Mapping comparison
+        if type(other) is type(self):
+            return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+        return Mapping.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class Entity(Record):
+    __slots__ = ('name', 'fields', 'options')
+
+    def __init__(self, name, fields, options=None):
+        self.name = intern_name(name)
+        self.fields = fields
+        self.options = options if options is not None else []
+
+
+class Field(Record):
+    __slots__ = ('name', 'type', 'options')
+
+    def __init__(self, name, typename, options=None):
+        self.name = intern_name(name)
+        self.type = intern_name(typename)
+        self.options = options if options is not None else Options.EMPTY
+
+
+class Options(Mapping):
+    """
+    Immutable mapping of field or entity options.
+    Equal options are shared between fields through `OptionsPool`,
+    so nobody may change values (including nested lists) in place.
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, data=()):
+        self._data = dict(data)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __eq__(self, other):
+        if isinstance(other, Options):
+            return self is other or self._data == other._data
+        return Mapping.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._data)
+
+
+Options.EMPTY = Options()
+
+
+class OptionsPool(object):
+    """
+    Returns the same `Options` instance for equal option dicts.
+    """
+
+    def __init__(self):
+        self.pool = {}
+
+    def options(self, data):
+        if not data:
+            return Options.EMPTY
+        key = tuple(sorted(
+            (name, type(value).__name__, repr(value))
+            for name, value in data.items()
+        ))
+        try:
+            return self.pool[key]
+        except KeyError:
+            options = Options((intern_name(name), value) for name, value in data.items())
+            self.pool[key] = options
+            return options
+
+
+def intern_name(name):
+    if type(name) is str:
+        return intern(name)
+    return name
+
+
+def collect_requisites(entities):
+    requisites = {}
+    for entity in entities:
+        for field in entity['fields']:
+            master = field['type']
+            dependant = entity['name']
+            requisites.setdefault(dependant, set()).add(master)
+            if 'entity' in field['options']:
+                if field['type'] == 'Link':
+                    master = field['options']['entity']
+                    dependant = entity['name']
+                elif field['type'] == 'List':
+                    master = entity['name']
+                    dependant = field['options']['entity']
+                requisites.setdefault(dependant, set()).add(master)
+    return requisites
+
+
+def collect_links(entities):
+    links = {}
+    for entity in entities:
+        for field in entity['fields']:
+            if field['type'] in ('Link', 'List') and 'entity' in field['options']:
+                links.setdefault(entity['name'], set()).add(field['options']['entity'])
+    return links
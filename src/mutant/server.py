@@ -0,0 +1,199 @@
+import errno
+import json
+import logging
+import os
+import socket
+import stat
+import sys
+import tempfile
+import traceback
+
+from six import StringIO
+from six.moves import socketserver
+
+import mutant
+
+
+logger = logging.getLogger(__name__)
+
+
+def default_socket_path():
+    """
+    Socket is kept in per-user directory: $XDG_RUNTIME_DIR,
+    or private mutant-UID directory in temporary directory, that is created by `serve`.
+    """
+    if os.environ.get('MUTANT_SOCKET'):
+        return os.environ['MUTANT_SOCKET']
+    if os.environ.get('XDG_RUNTIME_DIR'):
+        return os.path.join(os.environ['XDG_RUNTIME_DIR'], 'mutant.sock')
+    return os.path.join(default_socket_directory(), 'mutant.sock')
+
+
+def default_socket_directory():
+    return os.path.join(tempfile.gettempdir(), 'mutant-{0}'.format(os.getuid()))
+
+
+def private_directory(directory):
+    """
+    Creates directory only user can access, returns False if existing directory is not private.
+    """
+    try:
+        os.mkdir(directory, 0o700)
+    except OSError as exc:
+        if exc.errno != errno.EEXIST:
+            raise
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        logger.error('Directory %s must be owned by user and accessible only by user', directory)
+        return False
+    return True
+
+
+def is_trusted(path):
+    """
+    Daemon socket is trusted only if it was created by the same user.
+    """
+    try:
+        info = os.stat(path)
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        logger.warning('Ignoring daemon socket %s, that is not owned by user', path)
+        return False
+    return True
+
+
+class MutantServer(socketserver.UnixStreamServer):
+    """
+    Executes mutate commands sent by `forward` one by one,
+    keeping apps with loaded plugins and compiled templates resident between requests.
+    Requests are not run in parallel, because each of them changes working directory.
+    """
+
+    def __init__(self, path):
+        socketserver.UnixStreamServer.__init__(self, path, RequestHandler)
+        self.apps = {}
+
+    def app(self, *extension_names):
+        if extension_names not in self.apps:
+            from mutant.main import create_app
+            self.apps[extension_names] = create_app(*extension_names)
+        return self.apps[extension_names]
+
+    def execute(self, request):
+        """
+        Runs command line in working directory of client and returns exit code with captured output.
+        Environment of client is not sent: client passes cache directory it resolved as --cache-dir.
+        """
+        from mutant.main import parse_cli_options, run
+        if request.get('version') != mutant.__version__:
+            return {'error': 'Daemon runs mutant {0}'.format(mutant.__version__)}
+        stdout = StringIO()
+        stderr = StringIO()
+        cwd = os.getcwd()
+        try:
+            os.chdir(request['cwd'])
+            options = parse_cli_options(request['argv'])
+            code = run(options, StringIO(request.get('stdin') or ''), stdout, stderr, self.app)
+        except SystemExit as exc:
+            code = exc.code
+        except Exception:
+            stderr.write(traceback.format_exc())
+            code = 1
+        finally:
+            os.chdir(cwd)
+        return {'code': code or 0, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = json.loads(self.rfile.read().decode('utf-8'))
+        logger.info('Request: %s', ' '.join(request.get('argv', [])))
+        response = self.server.execute(request)
+        self.wfile.write(json.dumps(response).encode('utf-8'))
+
+
+def serve(path):
+    """
+    Runs daemon on Unix socket until it's interrupted.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory == default_socket_directory() and not private_directory(directory):
+        return 1
+    if os.path.exists(path):
+        if is_running(path):
+            logger.error('Daemon is already running on %s', path)
+            return 1
+        os.remove(path)
+    # Socket is accessible only by user from the moment it's bound
+    umask = os.umask(0o177)
+    try:
+        server = MutantServer(path)
+    finally:
+        os.umask(umask)
+    logger.info('Serving on %s', path)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(path)
+    return 0
+
+
+def is_running(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except socket.error:
+        return False
+    finally:
+        sock.close()
+    return True
+
+
+def forward(argv, path, stdin=None):
+    """
+    Sends command line with text of standard input to daemon and writes it's output to standard streams.
+    Returns exit code, or None if daemon is not running and command must be executed locally.
+    """
+    if not os.path.exists(path) or not is_trusted(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except socket.error as exc:
+        if exc.errno not in (errno.ECONNREFUSED, errno.ENOENT):
+            logger.warning('Can not connect to daemon: %s', exc)
+        sock.close()
+        return None
+    try:
+        request = {
+            'version': mutant.__version__,
+            'argv': list(argv),
+            'cwd': os.getcwd(),
+            'stdin': stdin,
+        }
+        sock.sendall(json.dumps(request).encode('utf-8'))
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        sock.close()
+    try:
+        response = json.loads(b''.join(chunks).decode('utf-8'))
+        if 'error' in response:
+            logger.warning('%s, running locally', response['error'])
+            return None
+        stdout, stderr, code = response['stdout'], response['stderr'], response['code']
+    except (ValueError, KeyError, TypeError) as exc:
+        logger.warning('Invalid response of daemon (%s), running locally', exc)
+        return None
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    return code
@@ -0,0 +1,88 @@
+"""
+Two-pass parsing of definitions, that are too large to be kept in memory three times
+(read data, normalized data and parsed schema).
+
+Reader yields (name, fields) pairs one by one with `iter_entities(stream)`,
+parser middlewares normalize them with `before_parse_stream(entities, scanning)`
+and parser defines each entity separately.
+The first pass keeps only entity names and requisites to order entities,
+the second pass yields parsed entities in that order.
+"""
+import logging
+
+from mutant.graph import DependencyGraph
+from mutant.schema import OptionsPool, Schema, collect_requisites
+
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingSchema(object):
+    """
+    Schema, that is read entity by entity each time it's iterated.
+    `read` is a function, that returns new iterator of (name, fields) pairs read from definition.
+
+    Entity is yielded as soon as all entities before it in order are yielded,
+    entities, that are found in definition earlier, wait for them.
+    So peak memory is bounded by the largest entity, when definition lists requisites first.
+    If entity name is defined several times, the last definition is used.
+
+    Generators, that do not support streaming (see `streaming` attribute),
+    get ordinary `Schema` made by `materialize`.
+    """
+    streaming = True
+
+    def __init__(self, read, middlewares, parser):
+        self.read = read
+        self.middlewares = middlewares
+        self.parser = parser
+        self.requisites, self._last = self._scan()
+        self.names = self.requisites.order()
+
+    def __iter__(self):
+        pool = OptionsPool()
+        pending = {}
+        index = 0
+        for position, (name, fields) in enumerate(self._entities(scanning=False)):
+            if self._last.get(name) != position:
+                continue
+            pending[name] = self.parser.define_entity(name, fields, pool)
+            while index < len(self.names) and self.names[index] in pending:
+                yield pending.pop(self.names[index])
+                index += 1
+        if pending or index < len(self.names):
+            raise ValueError('Definition has changed since it was scanned')
+
+    def __len__(self):
+        return len(self.names)
+
+    def materialize(self):
+        return Schema(self, requisites=self.requisites)
+
+    def _entities(self, scanning):
+        entities = self.read()
+        for middleware in self.middlewares:
+            if hasattr(middleware, 'before_parse_stream'):
+                entities = middleware.before_parse_stream(entities, scanning)
+        return entities
+
+    def _scan(self):
+        """
+        Returns requisites graph and position of the last definition of each entity.
+        """
+        last = {}
+        requisites_of = {}
+        for position, (name, fields) in enumerate(self._entities(scanning=True)):
+            last[name] = position
+            requisites_of[name] = collect_requisites([self.parser.define_entity(name, fields)])
+        requisites = {}
+        for entity_requisites in requisites_of.values():
+            for dependant, masters in entity_requisites.items():
+                requisites.setdefault(dependant, set()).update(masters)
+        for middleware in self.middlewares:
+            if hasattr(middleware, 'resolve_requisites'):
+                requisites = middleware.resolve_requisites(requisites)
+        graph = DependencyGraph(last, requisites)
+        for cycle in graph.cycles():
+            logger.info('Cyclic requisites: %s', ', '.join(cycle))
+        return graph, last
@@ -0,0 +1,83 @@
+import logging
+import os
+import time
+
+from mutant.cache import file_digest
+
+
+logger = logging.getLogger(__name__)
+
+
+class Watcher(object):
+    """
+    Polls files for changes of their content.
+    Files are stat'ed on each poll and hashed only when size or modification time changed,
+    so touching file without changing it is not reported.
+    """
+
+    def __init__(self, interval=0.5, sleep=time.sleep):
+        self.interval = interval
+        self.sleep = sleep
+        self.states = {}
+
+    def watch(self, paths):
+        """
+        Sets files to watch, keeping known state of files, that were watched before.
+        """
+        self.states = dict((path, self.states.get(path) or self.state(path)) for path in paths)
+
+    def changed(self):
+        """
+        Returns paths, whose content changed since the last call.
+        """
+        result = []
+        for path, old in sorted(self.states.items()):
+            new = self.state(path, old)
+            if new is None:
+                # File is being replaced by editor, check it on the next poll
+                continue
+            self.states[path] = new
+            if old is None or new[1] != old[1]:
+                result.append(path)
+        return result
+
+    def wait(self):
+        """
+        Blocks until some of watched files change, returns their paths.
+        """
+        while True:
+            changed = self.changed()
+            if changed:
+                return changed
+            self.sleep(self.interval)
+
+    @staticmethod
+    def state(path, old=None):
+        """
+        Returns (stat, digest) pair of file or None if it does not exist.
+        """
+        try:
+            stat = os.stat(path)
+            stat = (stat.st_size, stat.st_mtime)
+            if old is not None and old[0] == stat:
+                return old
+            return stat, file_digest(path)
+        except (IOError, OSError):
+            return None
+
+
+def write_if_changed(path, output):
+    """
+    Writes output to file only if it differs from file content,
+    so tools watching file modification time are not triggered needlessly.
+    Returns True if file was written.
+    """
+    try:
+        with open(path) as fp:
+            if fp.read() == output:
+                return False
+    except (IOError, OSError):
+        pass
+    with open(path, 'w') as fp:
+        fp.write(output)
+    return True
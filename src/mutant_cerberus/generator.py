@@ -1,36 +1,16 @@
 from __future__ import unicode_literals
 
 import logging
+from functools import partial
 
-from jinja2 import Template
+from mutant.generators.writer import CodeWriter, Fragment
+from mutant.incremental import Part
+from mutant.schema import Schema
 
 
 logger = logging.getLogger(__name__)
 
 
-FILE_TEMPLATE = Template("""
-rules = {
-    {%- for entity in entities %}
-    {{ render_entity(entity) }}
-    {%- endfor %}
-}
-""".lstrip())
-
-
-ENTITY_TEMPLATE = Template("""
-"{{ entity['name'] }}": {{ render_entity_body(entity) }},
-""".strip())
-
-
-ENTITY_BODY_TEMPLATE = Template("""
-{
-{%- for field in entity['fields'] %}
-{{ render_field(field) }}
-{%- endfor %}
-}
-""".strip())
-
-
 OPTIONS = (
     ('type', True),
     ('required', False),
@@ -83,57 +63,158 @@ ALIASES = {
 }
 
 
-FIELD_PATTERN = '"{name}": {{\n{options}\n}},'
+RULES_HEADER = 'rules = {\n'
+
+
+REGISTRY_FOOTER = """
+
+
+def register(schema_registry):
+    schema_registry.extend(rules)
+"""
+
+
+MODES = ('inline', 'registry')
 
 
 class CerberusSchemaGenerator(object):
-    def __init__(self, schema):
-        self.entities = schema
+    """
+    Renders Cerberus validation rules for all entities.
+    In `inline` mode (default) linked entities are embedded into each rule set.
+    In `registry` mode each entity is rendered once and linked entities
+    are referred by name, rules are meant to be added to Cerberus schema registry.
+    """
+    output_name = 'cerberus.py'
+    option_names = ('mode',)
+
+    def __init__(self, schema, mode='inline'):
+        if mode not in MODES:
+            raise ValueError("Unknown Cerberus generator mode '{0}', expected one of: {1}"
+                             .format(mode, ', '.join(MODES)))
+        self.mode = mode
+        self.entities = Schema.of(schema)
         self.in_render = set()
+        self.fragments = {}
+        self._embedded = None
+        self.list_fragments = {}
+        self.references = {}
 
     def render(self):
-        return FILE_TEMPLATE.render(
-            entities=self.entities,
-            render_entity=self.render_entity,
-        )
+        return ''.join(self.render_iter())
 
-    def render_entity(self, entity):
-        return ENTITY_TEMPLATE.render(
-            entity=entity,
-            render_entity_body=lambda x: self.indent(self.render_entity_body(x)).lstrip(),
-        )
+    def render_iter(self):
+        """
+        Yields rendered rules entity by entity.
+        """
+        yield RULES_HEADER
+        for entity in self.entities:
+            yield self.render_rule(entity)
+        yield self.render_footer()
+
+    def render_parts(self):
+        """
+        Returns output split into parts, one per entity (see `mutant.incremental`).
+        """
+        parts = [Part.literal(RULES_HEADER)]
+        for entity in self.entities:
+            parts.append(Part(
+                ('rule', entity['name']),
+                self.entity_sources(entity['name']),
+                partial(self.render_rule, entity),
+            ))
+        parts.append(Part.literal(self.render_footer()))
+        return parts
+
+    def render_footer(self):
+        if self.mode == 'registry':
+            return '}' + REGISTRY_FOOTER.rstrip()
+        return '}'
+
+    def entity_sources(self, name):
+        """
+        Names of entities, that rendered rule depends on:
+        entity itself and entities it links, in inline mode also all entities embedded into it.
+        """
+        links = self.entities.links
+        sources = set([name])
+        if self.mode == 'inline':
+            sources.update(self.entities.embedding.descendants(name))
+        for source in list(sources):
+            sources.update(links.get(source, ()))
+        return sources
+
+    def render_rule(self, entity):
+        writer = CodeWriter()
+        with writer.indented():
+            self.write_entity(writer, entity)
+        return writer.getvalue()
+
+    def write_entity(self, writer, entity):
+        writer.insert(self.render_entity_body(entity), '"{0}": '.format(entity['name']), ',')
 
     def render_entity_body(self, entity):
-        self.in_render.add(entity['name'])
-        result = ENTITY_BODY_TEMPLATE.render(
-            entity=entity,
-            render_field=self.render_field,
+        """
+        Entity body depends only on entities, that are being rendered
+        and can be reached from this entity by links.
+        So rendered bodies are cached by entity name and such recursion context.
+        In registry mode each body is rendered only once and is not cached,
+        as well as bodies of entities, that are not linked and are never embedded.
+        """
+        name = entity['name']
+        if self.mode == 'registry' or name not in self.embedded:
+            return self._render_entity_body(entity)
+        embedding = self.entities.embedding
+        context = frozenset(
+            other for other in self.in_render
+            if embedding.reaches(name, other)
         )
-        self.in_render.remove(entity['name'])
-        return result
-
-    def render_field(self, field):
-        self.apply_triggers(field)
+        key = (name, context)
+        if key not in self.fragments:
+            self.fragments[key] = self._render_entity_body(entity)
+        return self.fragments[key]
+
+    @property
+    def embedded(self):
+        """
+        Names of entities, that are linked by some entity, so their bodies can be embedded.
+        """
+        if self._embedded is None:
+            self._embedded = set()
+            for targets in self.entities.links.values():
+                self._embedded.update(targets)
+        return self._embedded
+
+    def _render_entity_body(self, entity):
+        # Only entity, that reaches itself by links, can be met again while it's embedded
+        recursive = self.entities.embedding.reaches(entity['name'], entity['name'])
+        if recursive:
+            self.in_render.add(entity['name'])
+        body = Fragment()
+        body.line('{')
+        with body.indented():
+            for field in entity['fields']:
+                self.write_field(body, field)
+        body.line('}')
+        if recursive:
+            self.in_render.remove(entity['name'])
+        return body
+
+    def write_field(self, writer, field):
         full_options = dict(field['options'], type=field['type'])
-        rendered_options = []
-        for option, is_quoted in OPTIONS:
-            rendered = self.render_option(option, is_quoted, full_options)
-            if rendered is not None:
-                rendered_options.append(rendered)
-        return self.indent(
-            FIELD_PATTERN.format(
-                name=field['name'],
-                options=self.indent('\n'.join(rendered_options)),
-            )
-        )
+        self.apply_triggers(full_options)
+        writer.line('"{0}": {{'.format(field['name']))
+        with writer.indented():
+            for option, is_quoted in OPTIONS:
+                self.write_option(writer, option, is_quoted, full_options)
+        writer.line('},')
 
     @staticmethod
-    def apply_triggers(field):
+    def apply_triggers(options):
         for trigger, option in TRIGGERS.items():
-            if trigger in field['options']:
-                field['options'].setdefault(option, field['options'][trigger])
+            if trigger in options:
+                options.setdefault(option, options[trigger])
 
-    def render_option(self, key, is_quoted, field_options):
+    def write_option(self, writer, key, is_quoted, field_options):
         OPT_PATTERN = '"{key}": {value},'
         aliased = ALIASES.get(key, key)
         if aliased in field_options:
@@ -142,41 +223,44 @@ class CerberusSchemaGenerator(object):
                 value = TYPE_MAPPINGS[value]
             if key == 'schema':
                 if field_options['type'] == 'List':
-                    value = self.embed_entity_list(field_options[aliased]).lstrip()
+                    writer.insert(self.embed_entity_list(value), '"schema": ', ',')
+                    return
                 if field_options['type'] == 'Link':
-                    value = self.embed_entity(field_options[aliased])
-                    if value is None:
-                        return None
-                    else:
-                        value = value.lstrip()
+                    body = self.embed_entity(value)
+                    if body is not None:
+                        writer.insert(body, '"schema": ', ',')
+                    return
             elif is_quoted:
                 value = '"{0}"'.format(value)
-            return OPT_PATTERN.format(key=key, value=value)
+            writer.line(OPT_PATTERN.format(key=key, value=value))
 
     def embed_entity_list(self, entity_name):
-        return (
-            self.indent(
-                '{{\n'
-                '"type": "dict",\n'
-                '"schema": {0},\n'.format(self.embed_entity(entity_name))
-            ) +
-            '\n}'
-        )
+        body = self.embed_entity(entity_name)
+        if body not in self.list_fragments:
+            wrapper = Fragment()
+            wrapper.line('{')
+            with wrapper.indented():
+                wrapper.line('"type": "dict",')
+                if body is None:
+                    wrapper.line('"schema": None,')
+                else:
+                    wrapper.insert(body, '"schema": ', ',')
+            wrapper.line('}')
+            self.list_fragments[body] = wrapper
+        return self.list_fragments[body]
 
     def embed_entity(self, entity_name):
+        if self.mode == 'registry':
+            if entity_name not in self.references:
+                self.references[entity_name] = Fragment()
+                self.references[entity_name].line(
+                    '"{0}"'.format(self.entities.entity(entity_name)['name'])
+                )
+            return self.references[entity_name]
         if entity_name in self.in_render:
             # recursive link, can not embed
             return None
-        for entity in self.entities:
-            if entity_name == entity['name']:
-                return self.render_entity_body(entity)
-        raise KeyError(entity_name)
-
-    def indent(self, text):
-        return '\n'.join([
-            '    ' + line
-            for line in text.splitlines()
-        ])
+        return self.render_entity_body(self.entities.entity(entity_name))
 
 
 def register(app):
@@ -1,12 +1,17 @@
+import codecs
 import itertools
 import logging
+import tempfile
 
-import inflect
-from six import string_types
+from six import string_types, text_type
 
+from mutant import inflection
 from mutant.generators.base import BaseGenerator
 from mutant.generators.utils import JinjaFieldGenerator
-from .templates import DJANGO_FILE_TEMPLATE, DJANGO_MODEL_TEMPLATE, DJANGO_FIELD_TEMPLATE
+from mutant.generators.writer import CodeWriter
+from mutant.incremental import Part
+from mutant.schema import Schema
+from .templates import DJANGO_FIELD_TEMPLATE
 
 
 logger = logging.getLogger(__name__)
@@ -41,9 +46,24 @@ SIMPLE_MAPPINGS = (
 )
 
 
+BACKENDS = ('jinja', 'native')
+
+
 class DjangoSchemaGenerator(BaseGenerator):
-    def __init__(self, schema, *args, **kwargs):
-        self.entities = schema
+    """
+    Renders Django models for all entities.
+    Fields are rendered by Jinja template with `jinja` backend (default),
+    or written directly by Python code with `native` backend, output is the same.
+    """
+    output_name = 'models.py'
+    option_names = ('backend',)
+
+    def __init__(self, schema, backend='jinja', *args, **kwargs):
+        if backend not in BACKENDS:
+            raise ValueError("Unknown Django generator backend '{0}', expected one of: {1}"
+                             .format(backend, ', '.join(BACKENDS)))
+        self.backend = backend
+        self.entities = schema if getattr(schema, 'streaming', False) else Schema.of(schema)
         super(DjangoSchemaGenerator, self).__init__(*args, **kwargs)
         self.field_generators = {
             'String': DjangoString,
@@ -61,11 +81,94 @@ class DjangoSchemaGenerator(BaseGenerator):
         extension(self)
 
     def render(self):
+        return ''.join(self.render_iter())
+
+    def render_iter(self):
+        """
+        Yields rendered models.py in chunks, each model is rendered when it's chunk is requested.
+        """
+        if getattr(self.entities, 'streaming', False):
+            for chunk in self.render_stream():
+                yield chunk
+            return
+        for part in self.render_parts():
+            yield part.render()
+
+    def render_stream(self):
+        """
+        Renders streamed schema (see `mutant.streaming`) without keeping all models in memory.
+        Models are written to temporary file as soon as entities of their requisites cycle are parsed,
+        header with imports of all models is yielded first.
+        Foreign keys are transferred only to entities later in order or in the same cycle,
+        so each model is complete when it's written.
+        """
+        transfers = {}
+        additional = []
+        imports = set()
+        written = set()
+        with tempfile.TemporaryFile() as models:
+            for component in self._stream_components():
+                renderers = [self.create_renderer(entity) for entity in component]
+                for renderer in renderers:
+                    additional.extend(renderer.additional_renderers())
+                    for entity_name, new_field in renderer.transfer_foreign_keys():
+                        transfers.setdefault(entity_name, []).append((new_field, renderer.sources))
+                for renderer in renderers:
+                    self._write_streamed(models, renderer, transfers, imports, written)
+            for renderer in additional:
+                self._write_streamed(models, renderer, transfers, imports, written)
+            yield self.render_header(sorted(imports))
+            models.seek(0)
+            reader = codecs.getreader('utf-8')(models)
+            for chunk in iter(lambda: reader.read(65536), u''):
+                yield chunk
+
+    def _stream_components(self):
+        """
+        Groups streamed entities by requisites cycles, each entity out of cycle is a group itself.
+        """
+        graph = self.entities.requisites
+        component = []
+        for entity in self.entities:
+            component.append(entity)
+            if len(component) == len(graph.components[graph.component_of[entity['name']]]):
+                yield component
+                component = []
+
+    def _write_streamed(self, models, renderer, transfers, imports, written):
+        if renderer.entity_name not in written:
+            for new_field, sources in transfers.pop(renderer.entity_name, []):
+                renderer.fields.append(new_field)
+                renderer.sources.update(sources)
+        if self.backend == 'native':
+            renderer.native = True
+        imports.update(renderer.render_imports())
+        if written:
+            models.write(b'\n\n')
+        models.write(renderer.render().encode('utf-8'))
+        written.add(renderer.entity_name)
+
+    def render_parts(self):
+        """
+        Returns output split into parts, one per model (see `mutant.incremental`).
+        """
         entities = self._renderers()
-        return DJANGO_FILE_TEMPLATE.render(
-            entities=entities,
-            imports=self._render_imports(entities),
-        )
+        parts = [Part.literal(self.render_header(self._render_imports(entities)))]
+        for i, entity in enumerate(entities):
+            if i:
+                parts.append(Part.literal('\n\n'))
+            parts.append(Part(('model', entity.entity_name), entity.sources, entity.render))
+        return parts
+
+    @staticmethod
+    def render_header(imports):
+        writer = CodeWriter()
+        writer.line('from django.db import models')
+        for line in imports:
+            writer.line(line)
+        writer.line()
+        writer.line()
+        return writer.getvalue()
 
     def _render_imports(self, entity_renderers):
         lines = set()
@@ -77,20 +180,23 @@ class DjangoSchemaGenerator(BaseGenerator):
         entity_renderers = self.create_field_generators()
         self.create_additional_renderers(entity_renderers)
         self.transfer_foreign_keys(entity_renderers)
+        if self.backend == 'native':
+            for renderer in entity_renderers:
+                renderer.native = True
         return entity_renderers
 
     def create_field_generators(self):
-        entity_renderers = []
-        for entity in self.entities:
-            fgs = []
-            for field in entity['fields']:
-                if field['type'] in self.field_generators:
-                    fgs.append(self.field_generators[field['type']].for_field(field))
-                else:
-                    raise KeyError("Unknown Django field type '{0}': {1} in entity {2}"
-                                   .format(field['type'], field, entity['name']))
-            entity_renderers.append(DjangoEntity(entity['name'], fgs, entity['options']))
-        return entity_renderers
+        return [self.create_renderer(entity) for entity in self.entities]
+
+    def create_renderer(self, entity):
+        fgs = []
+        for field in entity['fields']:
+            if field['type'] in self.field_generators:
+                fgs.append(self.field_generators[field['type']].for_field(field))
+            else:
+                raise KeyError("Unknown Django field type '{0}': {1} in entity {2}"
+                               .format(field['type'], field, entity['name']))
+        return DjangoEntity(entity['name'], fgs, entity['options'])
 
     def create_additional_renderers(self, entity_renderers):
         for renderer in list(entity_renderers):
@@ -98,29 +204,54 @@ class DjangoSchemaGenerator(BaseGenerator):
 
     def transfer_foreign_keys(self, entity_renderers):
         transfers = []
+        by_name = {}
         for renderer in entity_renderers:
-            transfers.extend(renderer.transfer_foreign_keys())
-        for entity_name, new_field in transfers:
-            for renderer in entity_renderers:
-                if renderer.entity_name == entity_name:
-                    renderer.fields.append(new_field)
-                    break
+            for entity_name, new_field in renderer.transfer_foreign_keys():
+                transfers.append((entity_name, new_field, renderer.sources))
+            by_name.setdefault(renderer.entity_name, renderer)
+        for entity_name, new_field, sources in transfers:
+            if entity_name in by_name:
+                by_name[entity_name].fields.append(new_field)
+                by_name[entity_name].sources.update(sources)
 
 
 class DjangoEntity(object):
-    def __init__(self, entity_name, fields, options=None):
+    """
+    Renders Django model.
+    `sources` are names of schema entities, that model is made of:
+    the entity itself, entity with many to many field for intermediate model,
+    and entities, that transferred foreign keys to the model.
+    Fields are emitted without templates, if `native` is set.
+    """
+    native = False
+
+    def __init__(self, entity_name, fields, options=None, sources=None):
         self.entity_name = entity_name
         self.fields = fields
-        self.options = options or []
+        self.options = list(options or [])
+        self.sources = set(sources or [entity_name])
 
     def render(self):
         logger.debug(self.__dict__)
-        return DJANGO_MODEL_TEMPLATE.render(
-            name=self.entity_name,
-            fields=self.fields,
-            model_meta=self.model_meta(),
-            # options=self.entity_options
-        )
+        writer = CodeWriter()
+        self.write(writer)
+        return writer.getvalue()
+
+    def write(self, writer):
+        writer.line('class {0}(models.Model):'.format(self.entity_name))
+        with writer.indented():
+            writer.line('class Meta:')
+            with writer.indented():
+                for option in self.model_meta():
+                    writer.line(option)
+            for field in self.fields:
+                field.write_choices(writer)
+            writer.line()
+            for field in self.fields:
+                if self.native:
+                    field.emit(writer)
+                else:
+                    field.write(writer)
 
     def render_imports(self):
         lines = []
@@ -200,10 +331,11 @@ class DjangoBase(JinjaFieldGenerator):
 
     @classmethod
     def for_field(cls, field):
+        field_options = field['options']
         options = {
-            key: field['options'][key]
+            key: field_options[key]
             for key, default_value in (cls.DJANGO_ATTRIBUTES + cls.PROXY_ATTRIBUTES)
-            if key in field['options']
+            if key in field_options
         }
         return cls(name=field['name'], options=options)
 
@@ -233,11 +365,37 @@ class DjangoBase(JinjaFieldGenerator):
     def transfer_foreign_keys(self, *args, **kwargs):
         return []
 
-    def render_choices(self):
+    def write(self, writer):
+        """
+        Writes output of `render`, where each line is preceded by newline and indented to model body
+        (as field template renders it), at indentation of the writer.
+        """
+        for line in self.render().split('\n')[1:]:
+            if line.startswith(writer.indentation):
+                writer.line(line[len(writer.indentation):])
+            else:
+                writer.write(line + '\n')
+
+    def emit(self, writer):
+        """
+        Writes the same line as `write` does, but without rendering template.
+        Fields with own template or rendering are written by `write`.
+        """
+        own_rendering = defining_class(type(self), 'render') is not JinjaFieldGenerator
+        if own_rendering or self.template is not DJANGO_FIELD_TEMPLATE:
+            self.write(writer)
+            return
+        options = self.options
+        arguments = [text_type(value) for value in options['django_positional']]
+        arguments.extend(
+            u'{0}={1}'.format(name, value)
+            for name, value in options['django_attributes']
+        )
+        writer.line(u'{0} = {1}({2})'.format(self.name, options['django_field'], u', '.join(arguments)))
+
+    def write_choices(self, writer):
         if hasattr(self, 'choices'):
-            return self.choices.render_choices()
-        else:
-            return ''
+            self.choices.write(writer)
 
     def render_imports(self):
         return []
@@ -249,17 +407,15 @@ class DjangoChoices(object):
         self.choices = options['choices']
         self.plural_name = plural(self.name).upper()
 
-    def render_choices(self):
+    def write(self, writer):
         name = self.name.upper()
-        result = []
         for choice in self.choices:
-            result.append('{0}_{1} = "{1}"'.format(name, choice.replace(' ', '_').upper()))
-        result.append("{0} = (".format(self.plural_name))
-        for choice in self.choices:
-            result.append('    ({0}_{1}, "{2}"),'.format(name, choice.replace(' ', '_').upper(), choice))
-        result.append(")")
-        return ''.join(['    ' + line + '\n'
-                        for line in result])
+            writer.line('{0}_{1} = "{1}"'.format(name, choice.replace(' ', '_').upper()))
+        writer.line("{0} = (".format(self.plural_name))
+        with writer.indented():
+            for choice in self.choices:
+                writer.line('({0}_{1}, "{2}"),'.format(name, choice.replace(' ', '_').upper(), choice))
+        writer.line(")")
 
     def attribute_value(self):
         return self.plural_name
@@ -316,6 +472,7 @@ class DjangoList(DjangoBase):
         return DjangoEntity(
             entity_name=entity_name + self.options['entity'],
             fields=[m2m_from, m2m_to],
+            sources=[entity_name],
         )
 
     def transfer_foreign_keys(self, entity_name):
@@ -359,35 +516,18 @@ def create_simple_mapping_field(typename):
     )
 
 
-class DerivedEntity(object):
-    def __init__(self, name, fields, options=None):
-        self.name = name
-        self.fields = fields
-        self.options = options or {}
-
-
-class DerivedField(object):
-    def __init__(self, name, options=None):
-        self.name = name
-        self.options = options or {}
-
-
-__inflector = None
-
-
-def inflector():
-    global __inflector
-    if __inflector is None:
-        __inflector = inflect.engine()
-    return __inflector
+def defining_class(cls, attribute):
+    for klass in cls.__mro__:
+        if attribute in vars(klass):
+            return klass
 
 
 def singular(word):
-    return inflector().singular_noun(word)
+    return inflection.singular_noun(word)
 
 
 def plural(word):
-    return inflector().plural_noun(word)
+    return inflection.plural_noun(word)
 
 
 def register(app):
@@ -0,0 +1,16 @@
+import json
+
+
+class JsonReader(object):
+    """
+    Reads definitions in JSON, which machine-generated definitions can use
+    to skip slow YAML parsing. Structure is the same as in YAML definitions.
+    """
+
+    def read(self, stream):
+        return json.load(stream)
+
+
+def register(app):
+    reader = JsonReader()
+    app.register_reader('json', reader)
@@ -0,0 +1,19 @@
+import marshal
+
+
+class MarshalReader(object):
+    """
+    Reads definitions written with `marshal.dump` - fastest format to load,
+    but it's specific to Python version and must not be read from untrusted sources.
+    Structure is the same as in YAML definitions.
+    """
+
+    binary = True
+
+    def read(self, stream):
+        return marshal.loads(stream.read())
+
+
+def register(app):
+    reader = MarshalReader()
+    app.register_reader('marshal', reader)
@@ -2,7 +2,8 @@ import itertools
 import logging
 import collections
 from six import string_types
-import inflect
+
+from mutant import inflection
 
 
 logger = logging.getLogger(__name__)
@@ -11,14 +12,50 @@ logger = logging.getLogger(__name__)
 class ShorthandMiddleware(object):
     def __init__(self, *args, **kwargs):
         self.embedded = {}
+        self.custom_types = set()
+        self.shorthand_fields = {}
 
     def before_parse(self, definition):
         return self.normalize_schema(definition)
 
+    def before_parse_stream(self, entities, scanning):
+        """
+        Normalizes (name, fields) pairs one by one (see `mutant.streaming`).
+        Entity names and shorthands are collected while scanning (later shorthands win),
+        entities read before them are resolved on the second pass and by `resolve_requisites`.
+        """
+        if scanning:
+            self.custom_types = set()
+            self.shorthand_fields = {}
+        for entity, fields in entities:
+            if entity == 'SHORTHANDS':
+                if scanning:
+                    self.shorthand_fields.update(self.normalize_shorthands(fields))
+                continue
+            self.custom_types.add(entity)
+            self.embedded = {}
+            for item in self.normalize_entity(entity, fields).items():
+                yield item
+            for item in self.embedded.items():
+                yield item
+
+    def resolve_requisites(self, requisites):
+        """
+        Replaces shorthand names, that were not known yet while scanning, by their types.
+        """
+        return {
+            dependant: {
+                self.shorthand_fields[master]['type'] if master in self.shorthand_fields else master
+                for master in masters
+            }
+            for dependant, masters in requisites.items()
+        }
+
     def after_parse(self, result):
         return result
 
     def normalize_schema(self, entities):
+        self.embedded = {}
         self.custom_types = entities.keys()
         self.shorthand_fields = self.normalize_shorthands(entities.pop('SHORTHANDS', {}))
         result = [
@@ -108,8 +145,7 @@ class ShorthandMiddleware(object):
 
     @staticmethod
     def make_entity_name(field_name):
-        inflector = inflect.engine()
-        return (inflector.singular_noun(field_name) or field_name).title()
+        return (inflection.singular_noun(field_name) or field_name).title()
 
 
 def register(app):
@@ -1,10 +1,65 @@
-import yaml
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 class YamlReader(object):
+    """
+    Reads definitions with libyaml's `CSafeLoader` when PyYAML is built with it,
+    or with pure-Python `SafeLoader` otherwise.
+    """
+
+    def __init__(self):
+        self._loader = None
+
+    @property
+    def loader(self):
+        if self._loader is None:
+            import yaml
+            try:
+                self._loader = yaml.CSafeLoader
+            except AttributeError:
+                logger.info('libyaml is not available, reading YAML with pure-Python loader')
+                self._loader = yaml.SafeLoader
+        return self._loader
 
     def read(self, stream):
-        return yaml.load(stream)
+        import yaml
+        return yaml.load(stream, Loader=self.loader)
+
+    def iter_entities(self, stream):
+        """
+        Yields (name, fields) pairs of top level mapping one by one,
+        nodes of the next entity are not composed until previous one is consumed.
+        """
+        from yaml.events import MappingEndEvent, MappingStartEvent, StreamEndEvent
+        loader = self.stream_loader(stream)
+        try:
+            loader.get_event()  # StreamStartEvent
+            if loader.check_event(StreamEndEvent):
+                return
+            loader.get_event()  # DocumentStartEvent
+            if not loader.check_event(MappingStartEvent):
+                raise ValueError('Definition must be a mapping of entity names to fields')
+            loader.get_event()
+            while not loader.check_event(MappingEndEvent):
+                name = loader.construct_object(loader.compose_node(None, None))
+                fields = loader.construct_object(loader.compose_node(None, None), deep=True)
+                loader.constructed_objects = {}
+                yield name, fields
+        finally:
+            loader.dispose()
+
+    def stream_loader(self, stream):
+        from yaml.composer import Composer
+        loader_class = self.loader
+        if not issubclass(loader_class, Composer):
+            # libyaml loaders compose whole documents only
+            loader_class = type('Streaming' + loader_class.__name__, (loader_class, Composer), {})
+        loader = loader_class(stream)
+        loader.anchors = {}
+        return loader
 
 
 def register(app):
@@ -0,0 +1,39 @@
+rules = {
+    "Blog": {
+        "title": {
+            "type": "string",
+        },
+        "posts": {
+            "type": "list",
+            "schema": {
+                "type": "dict",
+                "schema": "Post",
+            },
+        },
+    },
+    "Post": {
+        "title": {
+            "type": "string",
+        },
+        "body": {
+            "type": "string",
+        },
+        "tags": {
+            "type": "list",
+            "schema": {
+                "type": "dict",
+                "schema": "Tag",
+            },
+        },
+    },
+    "Tag": {
+        "name": {
+            "type": "string",
+            "required": True,
+        },
+    },
+}
+
+
+def register(schema_registry):
+    schema_registry.extend(rules)
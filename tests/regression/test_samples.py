@@ -1,8 +1,15 @@
 import os
+import json
+import marshal
+import shutil
 import logging
+import tempfile
 import unittest
 
-from mutant.main import yaml_to_django, yaml_to_cerberus
+import yaml
+
+from mutant.batch import BatchConfig, find_definitions, run_batch
+from mutant.main import create_app, yaml_to_django, yaml_to_cerberus
 
 
 def here(*parts):
@@ -25,6 +32,84 @@ class YamlToDjangoRegressionTestCase(unittest.TestCase):
         self.yaml_to_django("blog")
         self.yaml_to_cerberus("blog")
 
+    def test_blog_registry(self):
+        schema = yaml_to_cerberus(here("blog", "definition.yml"), mode="registry")
+        with open(here("blog", "cerberus_registry.py")) as fp:
+            expect = fp.read().rstrip()
+        assert expect == schema
+
+    def test_streaming(self):
+        app = create_app('yaml', 'django', 'cerberus')
+        app.parse('yaml', here("musician", "definition.yml"))
+        for writer in ('django', 'cerberus'):
+            chunks = list(app.mutate_iter(writer))
+            assert len(chunks) > 1
+            assert ''.join(chunks) == app.mutate(writer)
+
+    def test_many_writers(self):
+        app = create_app('yaml', 'django', 'cerberus')
+        app.parse('yaml', here("blog", "definition.yml"))
+        models, rules = app.mutate_many([('django', {}), ('cerberus', {'mode': 'registry'})])
+        with open(here("blog", "models.py")) as fp:
+            assert fp.read() == models
+        with open(here("blog", "cerberus_registry.py")) as fp:
+            assert fp.read().rstrip() == rules
+
+    def test_native_backend(self):
+        for dirname in ("author", "musician", "blog"):
+            models = yaml_to_django(here(dirname, "definition.yml"), backend="native")
+            with open(here(dirname, "models.py")) as fp:
+                assert fp.read() == models
+        # granthub/models.py is not generated, so backends are compared with each other
+        app = create_app('yaml', 'django', 'django_json')
+        app.parse('yaml', here("granthub", "definition.yml"))
+        models = app.mutate('django', backend="native")
+        assert 'attributes = JSONField(blank=True)' in models
+        assert app.mutate('django') == models
+
+    def test_batch(self):
+        source = tempfile.mkdtemp()
+        output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source)
+        self.addCleanup(shutil.rmtree, output)
+        for dirname in ('author', 'blog', 'musician'):
+            os.mkdir(os.path.join(source, dirname))
+            shutil.copy(here(dirname, "definition.yml"), os.path.join(source, dirname))
+        os.mkdir(os.path.join(source, 'invalid'))
+        with open(os.path.join(source, 'invalid', 'definition.yml'), 'w') as fp:
+            fp.write('Author:\n  - name: Unknown\n')
+        config = BatchConfig('yaml', [('django', {})], output_root=output)
+        definitions = find_definitions(source, '**/definition.yml')
+        results = {
+            os.path.basename(os.path.dirname(result.definition)): result
+            for result in run_batch(config, source, definitions, jobs=2)
+        }
+        assert sorted(results) == ['author', 'blog', 'invalid', 'musician']
+        # Unknown field type fails its definition, but does not stop the batch
+        assert not results['invalid'].ok
+        assert 'Unknown Django field type' in results['invalid'].error
+        for dirname in ('author', 'blog', 'musician'):
+            assert results[dirname].ok
+            with open(here(dirname, "models.py")) as fp, open(os.path.join(output, dirname, "models.py")) as out:
+                assert fp.read() == out.read()
+
+    def test_json_and_marshal_readers(self):
+        output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output)
+        for dirname in ("author", "musician", "blog"):
+            with open(here(dirname, "definition.yml")) as fp:
+                data = yaml.safe_load(fp)
+            with open(os.path.join(output, dirname + ".json"), "w") as fp:
+                json.dump(data, fp)
+            with open(os.path.join(output, dirname + ".marshal"), "wb") as fp:
+                marshal.dump(data, fp)
+            with open(here(dirname, "models.py")) as fp:
+                expect = fp.read()
+            for reader in ("json", "marshal"):
+                app = create_app(reader, "django")
+                app.parse(reader, os.path.join(output, dirname + "." + reader))
+                assert expect == app.mutate("django")
+
     def yaml_to_django(self, dirname):
         models = yaml_to_django(here(dirname, "definition.yml"))
         with open(here(dirname, "models.py")) as fp:
@@ -0,0 +1,113 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from mutant import cache as cache_module
+from mutant.cache import OutputCache, SchemaCache, definition_digest, package_fingerprint
+from mutant.main import create_app
+
+
+class OutputCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache = OutputCache(os.path.join(self.directory, 'cache'))
+
+    def key(self, digest='sha', generator='django', **options):
+        return self.cache.key(digest, 'yaml', ['short', 'yaml', generator], generator, options)
+
+    def test_key_depends_on_definition_generator_and_options(self):
+        keys = set([
+            self.key(),
+            self.key(digest='other'),
+            self.key(generator='cerberus'),
+            self.key(mode='registry'),
+        ])
+        assert len(keys) == 4
+        assert self.key() == self.key()
+
+    def test_changed_source_invalidates_entry(self):
+        source = os.path.join(self.directory, 'shorthands.yml')
+        with open(source, 'w') as fp:
+            fp.write('Datetime: {type: datetime}')
+        self.cache.set(self.key(), 'models.py', u'output', [source])
+        assert self.cache.get(self.key())['output'] == u'output'
+        with open(source, 'w') as fp:
+            fp.write('Datetime: {type: date}')
+        assert self.cache.get(self.key()) is None
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.max_size = 350
+        for digest in ('a', 'b', 'c'):
+            self.cache.set(self.key(digest), 'models.py', u'x' * 50)
+            os.utime(self.cache.path(self.key(digest)), (ord(digest), ord(digest)))
+        self.cache.set(self.key('d'), 'models.py', u'x' * 50)
+        assert self.cache.get(self.key('a')) is None
+        assert self.cache.get(self.key('b')) is not None
+        assert self.cache.get(self.key('d')) is not None
+
+
+class SchemaCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.definition = os.path.join(self.directory, 'definition.yml')
+        with open(self.definition, 'w') as fp:
+            fp.write('Author:\n  - name: String\n')
+
+    def test_parsed_schema_is_loaded_from_cache(self):
+        app = create_app('yaml')
+        app.schema_cache = SchemaCache(os.path.join(self.directory, 'cache'))
+        schema = app.parse('yaml', self.definition)
+        app.parser = None  # parser must not be used on cache hit
+        cached = app.parse('yaml', self.definition)
+        assert cached is not schema
+        assert cached == schema
+        assert cached.names == ['Author']
+        assert app.sources == [self.definition]
+
+    def test_invalid_and_untrusted_entries_are_ignored(self):
+        cache = SchemaCache(os.path.join(self.directory, 'cache'))
+        cache.set('ab', [u'schema'])
+        assert cache.get('ab')['schema'] == [u'schema']
+        os.chmod(cache.path('ab'), 0o666)
+        assert cache.get('ab') is None
+        os.chmod(cache.path('ab'), 0o600)
+        with open(cache.path('ab'), 'wb') as fp:
+            fp.write(b'\x80\x04truncated')
+        assert cache.get('ab') is None
+
+    def test_same_definition_in_other_directory_is_not_shared(self):
+        cache = SchemaCache(os.path.join(self.directory, 'cache'))
+        definitions = []
+        for dirname, name in (('a', 'Alpha'), ('b', 'Beta')):
+            os.mkdir(os.path.join(self.directory, dirname))
+            with open(os.path.join(self.directory, dirname, 'lib.yml'), 'w') as fp:
+                fp.write('{0}:\n  - name\n'.format(name))
+            definitions.append(os.path.join(self.directory, dirname, 'definition.yml'))
+            with open(definitions[-1], 'w') as fp:
+                fp.write('INCLUDE: lib.yml\nThing:\n  - a\n')
+        assert definition_digest(definitions[0]) != definition_digest(definitions[1])
+        for definition, name in zip(definitions, ('Alpha', 'Beta')):
+            app = create_app('yaml')
+            app.schema_cache = cache
+            assert name in app.parse('yaml', definition).names
+
+
+def test_single_module_package_is_fingerprinted():
+    directory = tempfile.mkdtemp()
+    sys.path.insert(0, directory)
+    try:
+        path = os.path.join(directory, 'single_module_package.py')
+        fingerprints = []
+        for source in ('VERSION = 1\n', 'VERSION = 10\n'):
+            with open(path, 'w') as fp:
+                fp.write(source)
+            cache_module._fingerprints.clear()
+            fingerprints.append(package_fingerprint('single_module_package'))
+        assert fingerprints[0] != fingerprints[1]
+    finally:
+        sys.path.remove(directory)
+        shutil.rmtree(directory)
@@ -0,0 +1,34 @@
+from mutant.generators.utils import LazyTemplate
+from mutant.parsers.python_parser import PythonParser
+from mutant_django.generator import DjangoBase, DjangoSchemaGenerator
+
+
+class DjangoMoney(DjangoBase):
+    template = LazyTemplate('tests/money', """
+    {{ field_name }} = MoneyField(max_digits=10)
+    {{ field_name }}_note = models.TextField()""")
+
+
+class DjangoSecret(DjangoBase):
+    def render(self):
+        return '\n    # Encrypted\n    {0} = EncryptedField()'.format(self.name)
+
+
+def test_extension_fields_keep_field_template_contract():
+    schema = PythonParser().parse({
+        'Grant': [
+            {'amount': {'type': 'Money'}},
+            {'token': {'type': 'Secret'}},
+            {'title': {'type': 'String', 'max_length': 10}},
+        ],
+    })
+    for backend in ('jinja', 'native'):
+        generator = DjangoSchemaGenerator(schema, backend=backend)
+        generator.field_generators.update({'Money': DjangoMoney, 'Secret': DjangoSecret})
+        assert generator.render().endswith(
+            '    amount = MoneyField(max_digits=10)\n'
+            '    amount_note = models.TextField()\n'
+            '    # Encrypted\n'
+            '    token = EncryptedField()\n'
+            '    title = models.CharField(max_length=10)\n'
+        )
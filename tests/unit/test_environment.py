@@ -0,0 +1,35 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from mutant.generators.environment import environment, register_template, use_bytecode_cache
+from mutant.generators.utils import LazyTemplate
+
+
+def test_templates_are_shared_through_environment():
+    template = LazyTemplate('tests/greeting', 'Hello, {{ name }}!')
+    assert template.render(name='mutant') == 'Hello, mutant!'
+    assert environment().get_template('tests/greeting') is template.template
+    assert not environment().auto_reload
+
+
+def test_template_name_is_unique():
+    register_template('tests/unique', 'one')
+    register_template('tests/unique', 'one')
+    with pytest.raises(ValueError):
+        register_template('tests/unique', 'two')
+
+
+def test_bytecode_cache_is_used_only_when_enabled():
+    assert environment().bytecode_cache is None
+    directory = tempfile.mkdtemp()
+    try:
+        use_bytecode_cache(os.path.join(directory, 'jinja'))
+        LazyTemplate('tests/cached', '{{ 1 + 1 }}').render()
+        assert os.listdir(os.path.join(directory, 'jinja'))
+    finally:
+        use_bytecode_cache(None)
+        shutil.rmtree(directory)
+    assert environment().bytecode_cache is None
@@ -0,0 +1,60 @@
+from mutant.graph import DependencyGraph
+from mutant.parsers.python_parser import PythonParser
+
+
+def test_order_puts_requisites_first():
+    requisites = {
+        'Album': {'Musician', 'String'},
+        'Instrument': {'Musician'},
+        'Musician': {'String'},
+    }
+    graph = DependencyGraph(['Album', 'Instrument', 'Musician'], requisites)
+    assert graph.order() == ['Musician', 'Album', 'Instrument']
+    assert graph.cycles() == []
+
+
+def test_cycles_are_condensed():
+    requisites = {
+        'A': {'B'},
+        'B': {'A'},
+        'C': {'A', 'D'},
+        'D': {'D'},
+    }
+    graph = DependencyGraph(['D', 'C', 'B', 'A'], requisites)
+    assert graph.order() == ['A', 'B', 'D', 'C']
+    assert graph.cycles() == [['A', 'B'], ['D']]
+    assert graph.is_cyclic('D')
+    assert not graph.is_cyclic('C')
+
+
+def test_schema_embedding_index():
+    high_level = {
+        'Award': [
+            {'parent': {'type': 'Link', 'entity': 'Award'}},
+            {'awardees': {'type': 'List', 'entity': 'Awardee'}},
+        ],
+        'Awardee': [
+            {'name': {'type': 'String'}},
+        ],
+        'Participant': [
+            {'award': {'type': 'Link', 'entity': 'Award'}},
+        ],
+    }
+    schema = PythonParser().parse(high_level)
+    assert schema.embedding.descendants('Participant') == {'Award', 'Awardee'}
+    assert schema.embedding.reaches('Award', 'Award')
+    assert not schema.embedding.reaches('Awardee', 'Award')
+
+
+def test_schema_name_index():
+    high_level = {
+        'Award': [
+            {'parent': {'type': 'Link', 'entity': 'Award'}},
+        ],
+        'Participant': [
+            {'award': {'type': 'Link', 'entity': 'Award'}},
+        ],
+    }
+    schema = PythonParser().parse(high_level)
+    assert schema.entity('Participant')['fields'][0]['name'] == 'award'
+    assert 'Award' in schema and 'Awardee' not in schema
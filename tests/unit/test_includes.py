@@ -0,0 +1,128 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from mutant import includes
+from mutant.main import create_app
+
+
+def here(*parts):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), *parts)
+
+
+class IncludesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.write('shared/entities.yml', """
+INCLUDE: authority.yml
+SHORTHANDS:
+    Pid: {type: String, max-length: 64}
+Person:
+    - pid: Pid
+    - name
+""")
+        self.write('shared/authority.yml', """
+Authority:
+    - code
+""")
+        self.write('definition.yml', """
+INCLUDE:
+    - shared/entities.yml
+SHORTHANDS:
+    INCLUDE: ../regression/granthub/shorthands.yml
+    Pid: {type: String, max-length: 100}
+Award:
+    - pid: Pid
+    - authority: Authority
+    - person: Person
+    - project_start: Datetime
+""".replace('../regression', os.path.join(here(), '..', 'regression')))
+        self.definition = os.path.join(self.directory, 'definition.yml')
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as fp:
+            fp.write(text)
+
+    def test_included_definitions_are_merged(self):
+        app = create_app('yaml', 'cerberus')
+        schema = app.parse('yaml', self.definition)
+        assert sorted(schema.names) == ['Authority', 'Award', 'Person']
+        fields = {field['name']: field for field in schema.entity('Award')['fields']}
+        # Definition overrides included shorthands
+        assert fields['pid']['options']['max_length'] == 100
+        assert {field['name']: field for field in schema.entity('Person')['fields']}['pid']['options'] == {
+            'max_length': 100,
+        }
+        assert fields['project_start']['type'] == 'String'
+        assert 'regex' in fields['project_start']['options']
+        assert fields['authority']['type'] == 'Link'
+        assert sorted(app.sources[1:]) == sorted([
+            os.path.normpath(here('..', 'regression', 'granthub', 'shorthands.yml')),
+            os.path.join(self.directory, 'shared', 'authority.yml'),
+            os.path.join(self.directory, 'shared', 'entities.yml'),
+        ])
+
+    def test_streamed_definition(self):
+        expected = create_app('yaml', 'django')
+        expected.parse('yaml', self.definition)
+        streamed = create_app('yaml', 'django')
+        streamed.parse_stream('yaml', self.definition)
+        assert streamed.mutate('django') == expected.mutate('django')
+        assert sorted(streamed.sources) == sorted(expected.sources)
+
+    def test_definition_overrides_include_placed_after_it(self):
+        self.write('lib.yml', """
+SHORTHANDS:
+    Code: {type: String, max-length: 10}
+Thing:
+    - a
+""")
+        self.write('definition.yml', """
+SHORTHANDS:
+    Code: {type: String, max-length: 99}
+Thing:
+    - b: Code
+INCLUDE: lib.yml
+""")
+        outputs = []
+        for stream in (False, True):
+            app = create_app('yaml', 'django')
+            if stream:
+                app.parse_stream('yaml', self.definition)
+            else:
+                app.parse('yaml', self.definition)
+            outputs.append(app.mutate('django'))
+        assert 'b = models.CharField(max_length=99)' in outputs[0]
+        assert outputs[1] == outputs[0]
+
+    def test_included_file_is_parsed_once(self):
+        path = os.path.join(self.directory, 'shared', 'authority.yml')
+        app = create_app('yaml')
+        app.load_extensions()
+        reader = app.readers['yaml']
+        data = includes.read(reader, path)
+        assert includes.read(reader, path) is data
+        self.write('shared/authority.yml', 'Authority:\n    - name\n')
+        assert includes.read(reader, path) == {'Authority': ['name']}
+
+    def test_cyclic_include(self):
+        self.write('shared/authority.yml', 'INCLUDE: entities.yml\n')
+        app = create_app('yaml')
+        with self.assertRaises(ValueError):
+            app.parse('yaml', self.definition)
+
+    def test_stream_includes_from_current_directory(self):
+        app = create_app('yaml')
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        try:
+            schema = app.parse('yaml', io.StringIO(u'INCLUDE: shared/authority.yml\n'))
+        finally:
+            os.chdir(cwd)
+        assert schema.names == ['Authority']
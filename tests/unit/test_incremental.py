@@ -0,0 +1,62 @@
+import io
+import unittest
+
+from mutant.main import create_app
+
+
+DEFINITION = """
+Publisher:
+    - name
+Book:
+    - title
+    - publisher: Publisher
+    - reviews:
+        list-of:
+            - text
+Author:
+    - name
+    - books: {list-of: Book}
+Reader:
+    - nickname
+"""
+
+
+class IncrementalRenderingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('yaml', 'django', 'cerberus')
+
+    def mutate(self, definition, writer, **options):
+        self.app.parse('yaml', io.StringIO(definition))
+        result = self.app.mutate_incremental(writer, **options)
+        assert result == self.app.mutate(writer, **options)
+        return self.app.incremental[(writer, tuple(sorted(options.items())))]
+
+    def test_unchanged_schema_is_not_rendered(self):
+        for writer in ('django', 'cerberus'):
+            self.mutate(DEFINITION, writer)
+            renderer = self.mutate(DEFINITION, writer)
+            assert renderer.rendered == 0
+
+    def test_django_renders_changed_models(self):
+        self.mutate(DEFINITION, 'django')
+        renderer = self.mutate(DEFINITION.replace('- text', '- text\n            - rating: Integer'), 'django')
+        assert renderer.rendered == 1
+        renderer = self.mutate(DEFINITION.replace('- title', '- title\n    - isbn'), 'django')
+        # Book, and Review that got foreign key from it
+        assert renderer.rendered == 2
+
+    def test_cerberus_renders_rules_embedding_changed_entity(self):
+        self.mutate(DEFINITION, 'cerberus')
+        renderer = self.mutate(DEFINITION.replace('- name\nBook', '- name\n    - city\nBook'), 'cerberus')
+        # Publisher, Book that embeds Publisher and Author that embeds Book
+        assert renderer.rendered == 3
+        # Registry mode refers linked entities by name
+        self.mutate(DEFINITION, 'cerberus', mode='registry')
+        renderer = self.mutate(DEFINITION.replace('- name\nBook', '- name\n    - city\nBook'), 'cerberus',
+                               mode='registry')
+        assert renderer.rendered == 2
+
+    def test_removed_entity(self):
+        self.mutate(DEFINITION, 'django')
+        renderer = self.mutate(DEFINITION.replace('Reader:\n    - nickname\n', ''), 'django')
+        assert renderer.rendered == 0
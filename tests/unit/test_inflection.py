@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+import tempfile
+
+from mutant.inflection import Inflection
+
+
+class FakeEngine(object):
+    def __init__(self):
+        self.calls = 0
+
+    def plural_noun(self, word):
+        self.calls += 1
+        return word + 's'
+
+    def singular_noun(self, word):
+        self.calls += 1
+        return word.endswith('s') and word[:-1]
+
+
+def test_memo_is_bounded():
+    inflection = Inflection(memo_size=2)
+    inflection._engine = engine = FakeEngine()
+    assert inflection.plural_noun('post') == 'posts'
+    assert inflection.plural_noun('post') == 'posts'
+    assert engine.calls == 1
+    inflection.plural_noun('tag')
+    inflection.plural_noun('blog')
+    assert len(inflection.memo) == 2
+    inflection.plural_noun('post')
+    assert engine.calls == 4
+
+
+def test_table_is_persistent():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'cache', 'inflections.json')
+        inflection = Inflection()
+        inflection._engine = FakeEngine()
+        inflection.use_table(path)
+        assert inflection.singular_noun('posts') == 'post'
+        assert inflection.singular_noun('post') is False
+        inflection.save()
+        loaded = Inflection()
+        loaded._engine = engine = FakeEngine()
+        loaded.use_table(path)
+        assert loaded.singular_noun('posts') == 'post'
+        assert loaded.singular_noun('post') is False
+        assert engine.calls == 0
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_table_is_bounded_and_stamped():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'inflections.json')
+        inflection = Inflection(table_size=2)
+        inflection._engine = FakeEngine()
+        inflection.use_table(path)
+        for word in ('post', 'tag', 'blog'):
+            inflection.plural_noun(word)
+        inflection.save()
+        loaded = Inflection()
+        loaded.use_table(path)
+        assert list(loaded.table) == ['plural_noun:tag', 'plural_noun:blog']
+        with open(path, 'w') as fp:
+            json.dump({'inflect': 'other', 'forms': {'plural_noun:post': 'postz'}}, fp)
+        stale = Inflection()
+        stale.use_table(path)
+        assert stale.table == {}
+    finally:
+        shutil.rmtree(directory)
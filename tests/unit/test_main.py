@@ -0,0 +1,50 @@
+import socket
+import sys
+
+import pytest
+
+from mutant import server
+from mutant.main import generator_options, main, parse_cli_options
+
+
+def test_generator_options_go_to_writers_that_accept_them():
+    options = parse_cli_options([
+        '-O', 'backend=native', '-O', 'cerberus.mode=registry', 'django,cerberus', 'd.yml', '-o', 'out',
+    ])
+    assert generator_options(options.option, 'django') == {'backend': 'native'}
+    assert generator_options(options.option, 'cerberus') == {'mode': 'registry'}
+    options = parse_cli_options(['-O', 'mode=registry', 'django,cerberus', 'd.yml', '-o', 'out'])
+    assert generator_options(options.option, 'django') == {}
+    assert generator_options(options.option, 'cerberus') == {'mode': 'registry'}
+
+
+@pytest.mark.parametrize('argv, message', [
+    (['-O', 'mode', 'cerberus', 'd.yml'], 'Generator option must look like NAME=VALUE'),
+    (['-O', 'foo=bar', 'django', 'd.yml'], "None of writers has option 'foo'"),
+    (['-O', 'django.mode=registry', 'django', 'd.yml'], "Writer 'django' has no option 'mode'"),
+])
+def test_invalid_generator_option_is_usage_error(capsys, argv, message):
+    with pytest.raises(SystemExit) as exc_info:
+        parse_cli_options(argv)
+    assert exc_info.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_daemon_is_not_used_without_unix_sockets(monkeypatch, capsys, tmpdir):
+    monkeypatch.delattr(socket, 'AF_UNIX')
+    definition = tmpdir.join('definition.yml')
+    definition.write('Author:\n  - name\n')
+    monkeypatch.setattr(sys, 'argv', ['mutate', '--no-cache', 'django', str(definition)])
+    assert main() == 0
+    assert 'class Author(models.Model)' in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        parse_cli_options(['--serve'])
+
+
+def test_cache_directory_of_client_is_sent_to_daemon(monkeypatch):
+    forwarded = []
+    monkeypatch.setattr(server, 'forward', lambda argv, path, stdin=None: forwarded.append(argv) or 0)
+    monkeypatch.setattr(sys, 'argv', ['mutate', 'django', 'definition.yml'])
+    monkeypatch.setenv('MUTANT_CACHE_DIR', '/home/client/.cache/mutant')
+    assert main() == 0
+    assert forwarded == [['django', 'definition.yml', '--cache-dir', '/home/client/.cache/mutant']]
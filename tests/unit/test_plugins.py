@@ -0,0 +1,19 @@
+import io
+
+from mutant.main import create_app
+from mutant.plugins import plugin_module
+
+
+def test_plugin_module():
+    assert plugin_module('django') == 'mutant_django'
+    assert plugin_module('unknown') == 'mutant_unknown'
+
+
+def test_plugins_are_loaded_on_first_use():
+    app = create_app('yaml', 'django')
+    assert app.pending_extensions == ['short', 'yaml', 'django']
+    assert app.readers == {}
+    schema = app.parse('yaml', io.StringIO(u'Author:\n  - name\n'))
+    assert schema.names == ['Author']
+    assert app.pending_extensions == []
+    assert sorted(app.generators) == ['django']
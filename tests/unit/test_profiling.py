@@ -0,0 +1,32 @@
+import io
+
+from mutant.main import create_app
+from mutant.profiling import Profiler
+
+
+DEFINITION = u"""
+Musician:
+    - name: String
+"""
+
+
+def test_app_stages_are_profiled():
+    profiler = Profiler()
+    finished = []
+    profiler.add_hook(lambda record: finished.append(record.name))
+    app = create_app('yaml', 'django')
+    app.profiler = profiler
+    app.parse('yaml', io.StringIO(DEFINITION))
+    output = ''.join(app.mutate_iter('django'))
+    assert 'class Musician' in output
+    assert [record.name for record in profiler.totals()] == [
+        'load_extensions',
+        'read:yaml',
+        'before_parse:ShorthandMiddleware',
+        'parse',
+        'parse/order',
+        'after_parse:ShorthandMiddleware',
+        'generator:django',
+        'render:django',
+    ]
+    assert sorted(finished) == sorted(record.name for record in profiler.records)
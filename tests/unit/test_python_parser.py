@@ -31,3 +31,18 @@ def test_python_parser_sample():
     parser = PythonParser()
     result = parser.parse(high_level)
     assert result == expected
+
+
+def test_python_parser_shares_equal_options():
+    high_level = {
+        'Employee': [
+            {'first_name': {'type': 'String', 'max_length': 100}},
+            {'last_name': {'type': 'String', 'max_length': 100}},
+            {'OPTIONS': [{'verbose_name_plural': 'Employees'}]},
+        ],
+    }
+    entity, = PythonParser().parse(high_level)
+    first_name, last_name = entity['fields']
+    assert first_name.options is last_name.options
+    assert dict(last_name) == {'name': 'last_name', 'type': 'String', 'options': {'max_length': 100}}
+    assert entity.options == [{'verbose_name_plural': 'Employees'}]
@@ -0,0 +1,96 @@
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+
+import mutant
+from mutant.server import MutantServer, forward, private_directory
+
+
+def here(*parts):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'regression', *parts)
+
+
+def test_forward_to_daemon(capsys):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'mutant.sock')
+    server = MutantServer(path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        capsys.readouterr()
+        definition = here('musician', 'definition.yml')
+        assert forward(['django', definition, '--no-cache'], path) == 0
+        assert forward(['django', definition, '--no-cache'], path) == 0
+        assert len(server.apps) == 1
+        with open(here('musician', 'models.py')) as fp:
+            assert capsys.readouterr()[0] == fp.read() * 2
+        with open(definition) as fp:
+            assert forward(['django', '-', '--no-cache'], path, fp.read()) == 0
+        assert forward(['django', 'missing.yml', '--no-cache'], path) == 1
+        assert 'missing.yml' in capsys.readouterr()[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+        shutil.rmtree(directory)
+
+
+def test_forward_without_daemon():
+    assert forward(['django', 'definition.yml'], os.path.join(tempfile.gettempdir(), 'missing.sock')) is None
+
+
+def test_version_mismatch_runs_locally(monkeypatch):
+    server = MutantServer.__new__(MutantServer)
+    monkeypatch.setattr(mutant, '__version__', 'other')
+    assert 'error' in server.execute({'version': '1.0.0', 'argv': [], 'cwd': '.'})
+
+
+def test_socket_of_other_user_is_not_trusted(monkeypatch):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'mutant.sock')
+    server = MutantServer(path)
+    try:
+        uid = os.getuid()
+        monkeypatch.setattr(os, 'getuid', lambda: uid + 1)
+        assert forward(['django', 'definition.yml'], path) is None
+    finally:
+        server.server_close()
+        shutil.rmtree(directory)
+
+
+def test_invalid_response_runs_locally():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'mutant.sock')
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+
+    def respond():
+        connection, _ = listener.accept()
+        connection.recv(65536)
+        connection.sendall(b'{"code": 0, "std')
+        connection.close()
+
+    thread = threading.Thread(target=respond)
+    thread.start()
+    try:
+        assert forward(['django', 'definition.yml'], path) is None
+    finally:
+        thread.join()
+        listener.close()
+        shutil.rmtree(directory)
+
+
+def test_private_directory():
+    directory = tempfile.mkdtemp()
+    try:
+        private = os.path.join(directory, 'mutant')
+        assert private_directory(private)
+        assert stat.S_IMODE(os.stat(private).st_mode) == 0o700
+        os.chmod(private, 0o755)
+        assert not private_directory(private)
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mutant.main import create_app
+
+
+# Dependants go before requisites, shorthands go last, Post and Blog link each other
+DEFINITION = """
+Author:
+    - name
+    - books: {list-of: Book}
+    - editor: OptionalEditor
+Book:
+    - title
+    - publisher: Publisher
+    - reviews:
+        list-of:
+            - text
+Post:
+    - blog: Blog
+    - comments:
+        list-of:
+            - text
+Blog:
+    - title
+    - posts: {list-of: Post}
+    - featured: Post
+Publisher:
+    - country
+Editor:
+    - name
+Publisher:
+    - name
+SHORTHANDS:
+    OptionalEditor:
+        type: Editor
+        "null": true
+"""
+
+
+class StreamingTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.definition = os.path.join(directory, 'definition.yml')
+        with open(self.definition, 'w') as fp:
+            fp.write(DEFINITION)
+
+    def mutate(self, writer, stream, **options):
+        app = create_app('yaml', writer)
+        if stream:
+            app.parse_stream('yaml', self.definition)
+        else:
+            app.parse('yaml', self.definition)
+        return app.schema, app.mutate(writer, **options)
+
+    def test_schema(self):
+        expected, _ = self.mutate('django', stream=False)
+        streamed, _ = self.mutate('django', stream=True)
+        assert streamed.names == expected.names
+        assert list(streamed) == list(expected)
+        # The last definition wins
+        assert streamed.materialize().entity('Publisher')['fields'][0]['name'] == 'name'
+        assert streamed.requisites.cycles() == [['Blog', 'Post']]
+
+    def test_django(self):
+        for backend in ('jinja', 'native'):
+            _, expected = self.mutate('django', stream=False, backend=backend)
+            _, streamed = self.mutate('django', stream=True, backend=backend)
+            assert streamed == expected
+
+    def test_materialized_for_cerberus(self):
+        for mode in ('inline', 'registry'):
+            _, expected = self.mutate('cerberus', stream=False, mode=mode)
+            _, streamed = self.mutate('cerberus', stream=True, mode=mode)
+            assert streamed == expected
+
+    def test_reader_must_support_streaming(self):
+        app = create_app('json', 'django')
+        with self.assertRaises(ValueError):
+            app.parse_stream('json', self.definition)
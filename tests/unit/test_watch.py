@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mutant.watch import Watcher, write_if_changed
+
+
+class WatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'definition.yml')
+        self.write('Author: []')
+        self.watcher = Watcher(sleep=self.fail)
+        self.watcher.watch([self.path])
+
+    def write(self, content, mtime=1):
+        with open(self.path, 'w') as fp:
+            fp.write(content)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_touch_is_not_a_change(self):
+        self.write('Author: []', mtime=2)
+        assert self.watcher.changed() == []
+
+    def test_content_change_is_reported_once(self):
+        self.write('Author: [name: String]', mtime=2)
+        assert self.watcher.wait() == [self.path]
+        assert self.watcher.changed() == []
+
+    def test_removed_file_is_reported_when_it_reappears(self):
+        os.remove(self.path)
+        assert self.watcher.changed() == []
+        self.write('Book: []', mtime=3)
+        assert self.watcher.changed() == [self.path]
+
+
+def test_write_if_changed():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'models.py')
+        assert write_if_changed(path, 'class Author: pass\n')
+        os.utime(path, (1, 1))
+        assert not write_if_changed(path, 'class Author: pass\n')
+        assert os.stat(path).st_mtime == 1
+        assert write_if_changed(path, 'class Book: pass\n')
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,23 @@
+from mutant.generators.writer import CodeWriter, Fragment
+
+
+def test_fragment_is_inserted_at_writer_indentation():
+    body = Fragment()
+    body.line('{')
+    with body.indented():
+        body.line('"type": "string",')
+    body.line('}')
+    writer = CodeWriter()
+    writer.line('rules = {')
+    with writer.indented():
+        writer.insert(body, '"name": ', ',')
+        writer.line()
+    writer.write('}')
+    assert writer.getvalue() == (
+        'rules = {\n'
+        '    "name": {\n'
+        '        "type": "string",\n'
+        '    },\n'
+        '\n'
+        '}'
+    )
@@ -0,0 +1,15 @@
+import io
+
+import pytest
+import yaml
+
+from mutant_yaml.reader import YamlReader
+
+
+def test_reads_definition():
+    assert YamlReader().read(io.StringIO(u'Author:\n  - name\n')) == {'Author': ['name']}
+
+
+def test_does_not_construct_objects():
+    with pytest.raises(yaml.YAMLError):
+        YamlReader().read(io.StringIO(u'Author: !!python/object/apply:os.getcwd []\n'))